@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+STATIC_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+BUILD_DIR_NAME = '_build'
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_HEIGHTS = [240, 320, 480, 640, 960]
+
+
+def build_dir(image_dir):
+    return os.path.join(image_dir, BUILD_DIR_NAME)
+
+
+def manifest_path(image_dir):
+    return os.path.join(build_dir(image_dir), MANIFEST_NAME)
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {'bytes': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def load_manifest(image_dir):
+    try:
+        with open(manifest_path(image_dir), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception:
+        return {}
+
+    fresh = {}
+    for name, entry in manifest.get('emotions', {}).items():
+        source = os.path.join(image_dir, entry['source'])
+        try:
+            if source_signature(source) != entry['signature']:
+                continue
+        except OSError:
+            continue
+        if all(os.path.exists(os.path.join(build_dir(image_dir), level['file'])) for level in entry['levels']):
+            fresh[name] = entry
+    return fresh
+
+
+def pick_level(entry, width, height):
+    trimmed_width, trimmed_height = entry['size']
+    scale = min(width / trimmed_width, height / trimmed_height)
+    needed = trimmed_height * scale
+    for level in entry['levels']:
+        if level['height'] >= needed:
+            return level
+    return entry['levels'][-1]
+
+
+def current_rss():
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def ensure_qt():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtGui import QGuiApplication
+    app = QGuiApplication.instance()
+    if app is None:
+        app = QGuiApplication(sys.argv[:1])
+    return app
+
+
+def trim_rect(image):
+    from PyQt5.QtGui import QBitmap, QRegion
+    if not image.hasAlphaChannel():
+        return image.rect()
+    rect = QRegion(QBitmap.fromImage(image.createAlphaMask())).boundingRect()
+    return rect if not rect.isEmpty() else image.rect()
+
+
+def build(image_dir, heights=None, force=False):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    app = ensure_qt()
+    heights = sorted(heights or DEFAULT_HEIGHTS)
+    output_dir = build_dir(image_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    previous = {} if force else load_manifest(image_dir)
+    emotions = {}
+    written = set()
+
+    for file in sorted(os.listdir(image_dir)):
+        name, ext = os.path.splitext(file)
+        if ext.lower() not in STATIC_EXTENSIONS:
+            continue
+
+        source = os.path.join(image_dir, file)
+        signature = source_signature(source)
+        if name in previous and previous[name]['signature'] == signature:
+            emotions[name] = previous[name]
+            written.update(level['file'] for level in previous[name]['levels'])
+            continue
+
+        with open(source, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+
+        image = QImage(source)
+        if image.isNull():
+            continue
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        rect = trim_rect(image)
+        trimmed = image.copy(rect)
+
+        levels = []
+        for height in heights:
+            if height >= trimmed.height():
+                break
+            levels.append(trimmed.scaledToHeight(height, Qt.SmoothTransformation))
+        levels.append(trimmed)
+
+        entry_levels = []
+        for level in levels:
+            level_file = f"{digest}_{level.height()}.png"
+            level.save(os.path.join(output_dir, level_file), 'PNG')
+            written.add(level_file)
+            entry_levels.append({'file': level_file, 'width': level.width(), 'height': level.height()})
+
+        emotions[name] = {
+            'source': file,
+            'hash': digest,
+            'signature': signature,
+            'trim': [rect.x(), rect.y(), rect.width(), rect.height()],
+            'size': [trimmed.width(), trimmed.height()],
+            'levels': entry_levels,
+        }
+
+    for file in os.listdir(output_dir):
+        if file != MANIFEST_NAME and file not in written:
+            os.remove(os.path.join(output_dir, file))
+
+    with open(manifest_path(image_dir), 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'emotions': emotions}, f, ensure_ascii=False, indent=4)
+
+    return emotions
+
+
+def decode_all(paths):
+    from PyQt5.QtGui import QImage
+
+    rss_before = current_rss()
+    start = time.perf_counter()
+    images = [QImage(path) for path in paths]
+    elapsed = time.perf_counter() - start
+    rss_after = current_rss()
+    decoded_bytes = sum(image.byteCount() for image in images if not image.isNull())
+    rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    return elapsed, decoded_bytes, rss_delta
+
+
+def report(image_dir, width, height):
+    ensure_qt()
+    manifest = load_manifest(image_dir)
+    originals = [os.path.join(image_dir, entry['source']) for entry in manifest.values()]
+    compiled = [os.path.join(build_dir(image_dir), pick_level(entry, width, height)['file'])
+                for entry in manifest.values()]
+
+    print(f"{len(manifest)} 个表情，窗口 {width}x{height}")
+    for label, paths in (('原图', originals), ('预编译', compiled)):
+        elapsed, decoded_bytes, rss_delta = decode_all(paths)
+        rss_text = f"{rss_delta / 1048576:8.1f} MiB" if rss_delta is not None else "     n/a"
+        print(f"{label:<6} 解码 {elapsed * 1000:8.1f} ms  像素内存 {decoded_bytes / 1048576:8.1f} MiB  RSS增量 {rss_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预处理 image 目录：裁剪透明边框并生成多分辨率图片")
+    parser.add_argument('--image-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image'))
+    parser.add_argument('--heights', type=int, nargs='+', default=DEFAULT_HEIGHTS)
+    parser.add_argument('--force', action='store_true')
+    parser.add_argument('--report', action='store_true')
+    parser.add_argument('--size', type=int, nargs=2, default=[240, 320], metavar=('WIDTH', 'HEIGHT'))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    emotions = build(args.image_dir, args.heights, args.force)
+    print(f"已生成 {len(emotions)} 个表情，用时 {time.perf_counter() - start:.2f} s -> {manifest_path(args.image_dir)}")
+
+    if args.report:
+        report(args.image_dir, *args.size)
+
+
+if __name__ == '__main__':
+    main()
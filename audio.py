@@ -0,0 +1,188 @@
+import io
+import math
+import wave
+import warnings
+from array import array
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:
+        audioop = None
+
+PCM_SAMPLE_RATE = 24000
+PCM_SAMPLE_WIDTH = 2
+PCM_CHANNELS = 1
+
+FORMAT_EXTENSIONS = {
+    'pcm': '.wav',
+    'wav': '.wav',
+    'mp3': '.mp3',
+    'opus': '.ogg',
+}
+
+
+def sniff_format(data, requested=None):
+    if not data:
+        return None
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return 'wav'
+    if data[:4] == b'OggS':
+        return 'opus'
+    if data[:3] == b'ID3':
+        return 'mp3'
+    if requested == 'pcm':
+        return 'pcm'
+    if len(data) > 1 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0:
+        return 'mp3'
+    return None
+
+
+def wav_to_pcm(data):
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        if wav.getsampwidth() != PCM_SAMPLE_WIDTH or wav.getnchannels() != PCM_CHANNELS:
+            return None, None
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def read_wav(path):
+    with open(path, 'rb') as f:
+        return wav_to_pcm(f.read())
+
+
+def write_wav(path, pcm, sample_rate=PCM_SAMPLE_RATE):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(PCM_CHANNELS)
+        wav.setsampwidth(PCM_SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return path
+
+
+def pcm_duration(pcm, sample_rate=PCM_SAMPLE_RATE):
+    return len(pcm) / float(PCM_SAMPLE_WIDTH * PCM_CHANNELS * sample_rate)
+
+
+def frame_energies(pcm, sample_rate=PCM_SAMPLE_RATE, frame_ms=30):
+    frame_bytes = int(sample_rate * frame_ms / 1000) * PCM_SAMPLE_WIDTH
+    energies = []
+    for offset in range(0, len(pcm) - frame_bytes + 1, frame_bytes):
+        frame = pcm[offset:offset + frame_bytes]
+        if audioop is not None:
+            energies.append(audioop.rms(frame, PCM_SAMPLE_WIDTH))
+        else:
+            samples = array('h', frame)
+            energies.append(int(math.sqrt(sum(x * x for x in samples) / len(samples))))
+    return energies, frame_bytes
+
+
+def voice_segments(pcm, sample_rate=PCM_SAMPLE_RATE, frame_ms=30, min_rms=300,
+                   min_silence_ms=300, padding_ms=150):
+    energies, frame_bytes = frame_energies(pcm, sample_rate, frame_ms)
+    if not energies:
+        return []
+
+    noise_floor = sorted(energies)[len(energies) // 10]
+    threshold = max(min_rms, noise_floor * 3)
+    gap_frames = max(1, min_silence_ms // frame_ms)
+    pad_frames = padding_ms // frame_ms
+
+    segments = []
+    start = None
+    silent = 0
+    for i, energy in enumerate(energies):
+        if energy >= threshold:
+            if start is None:
+                start = i
+            silent = 0
+        elif start is not None:
+            silent += 1
+            if silent >= gap_frames:
+                segments.append((start, i - silent + 1))
+                start = None
+                silent = 0
+    if start is not None:
+        segments.append((start, len(energies) - silent))
+
+    return [
+        (max(0, first - pad_frames) * frame_bytes, min(len(energies), last + pad_frames) * frame_bytes)
+        for first, last in segments
+    ]
+
+
+def split_chunks(pcm, segments, sample_rate=PCM_SAMPLE_RATE, max_seconds=15):
+    max_bytes = int(max_seconds * sample_rate) * PCM_SAMPLE_WIDTH
+    chunks = []
+    current = b''
+    for start, end in segments:
+        piece = pcm[start:end]
+        if current and len(current) + len(piece) > max_bytes:
+            chunks.append(current)
+            current = b''
+        while len(piece) > max_bytes:
+            chunks.append(piece[:max_bytes])
+            piece = piece[max_bytes:]
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pcm_to_wav(pcm, sample_rate=PCM_SAMPLE_RATE):
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav:
+        wav.setnchannels(PCM_CHANNELS)
+        wav.setsampwidth(PCM_SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return output.getvalue()
+
+
+def trim_and_normalize(pcm, sample_rate=PCM_SAMPLE_RATE, silence_db=-45, target_dbfs=-18,
+                       peak_dbfs=-1, padding_ms=80, frame_ms=10):
+    frame_samples = max(1, int(sample_rate * frame_ms / 1000))
+    full_scale = 32768.0
+    silence = full_scale * 10 ** (silence_db / 20)
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is not None:
+        samples = np.frombuffer(pcm[:len(pcm) // 2 * 2], dtype='<i2').astype(np.float32)
+        frames = len(samples) // frame_samples
+        if not frames:
+            return pcm, 1.0
+        rms = np.sqrt(np.mean(np.square(samples[:frames * frame_samples].reshape(frames, frame_samples)), axis=1))
+        voiced = np.nonzero(rms >= silence)[0]
+        if not len(voiced):
+            return pcm, 1.0
+        pad = padding_ms // frame_ms
+        start = max(0, int(voiced[0]) - pad) * frame_samples
+        end = min(len(samples), (int(voiced[-1]) + 1 + pad) * frame_samples)
+        samples = samples[start:end]
+        loudness = float(np.sqrt(np.mean(np.square(rms[voiced]))))
+        peak = float(np.max(np.abs(samples))) or 1.0
+        gain = min(full_scale * 10 ** (target_dbfs / 20) / loudness, full_scale * 10 ** (peak_dbfs / 20) / peak)
+        if abs(gain - 1.0) > 0.01:
+            samples = np.clip(samples * gain, -32768, 32767)
+        return samples.astype('<i2').tobytes(), gain
+
+    energies, frame_bytes = frame_energies(pcm, sample_rate, frame_ms)
+    voiced = [i for i, energy in enumerate(energies) if energy >= silence]
+    if not voiced:
+        return pcm, 1.0
+    pad = padding_ms // frame_ms
+    start = max(0, voiced[0] - pad) * frame_bytes
+    end = min(len(pcm), (voiced[-1] + 1 + pad) * frame_bytes)
+    pcm = pcm[start:end]
+    if audioop is None:
+        return pcm, 1.0
+    loudness = math.sqrt(sum(energies[i] ** 2 for i in voiced) / len(voiced))
+    peak = audioop.max(pcm, PCM_SAMPLE_WIDTH) or 1
+    gain = min(full_scale * 10 ** (target_dbfs / 20) / loudness, full_scale * 10 ** (peak_dbfs / 20) / peak)
+    if abs(gain - 1.0) > 0.01:
+        pcm = audioop.mul(pcm, PCM_SAMPLE_WIDTH, gain)
+    return pcm, gain
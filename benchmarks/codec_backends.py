@@ -0,0 +1,67 @@
+import argparse
+import importlib
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+package = os.path.basename(PLUGIN_DIR)
+audio = importlib.import_module(f"{package}.audio")
+codec = importlib.import_module(f"{package}.codec")
+
+
+def make_pcm(seconds, sample_rate=audio.PCM_SAMPLE_RATE):
+    count = int(seconds * sample_rate)
+    return struct.pack(
+        f"<{count}h",
+        *(int(10000 * math.sin(2 * math.pi * 330 * i / sample_rate)) for i in range(count))
+    )
+
+
+def throughput(func, runs, seconds):
+    start = time.perf_counter()
+    ok = True
+    for _ in range(runs):
+        ok = func() and ok
+    elapsed = (time.perf_counter() - start) / runs
+    return ok, elapsed, seconds / elapsed if elapsed else float('inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="各编解码后端吞吐量")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    pcm = make_pcm(args.seconds)
+    backends = [
+        codec.InProcessBackend(),
+        codec.SubprocessBackend(PLUGIN_DIR),
+    ]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        wav_path = os.path.join(workdir, 'clip.wav')
+        audio.write_wav(wav_path, pcm)
+
+        for backend in backends:
+            if not backend.available():
+                print(f"{backend.name:<10} 不可用")
+                continue
+
+            silk_path = os.path.join(workdir, f"{backend.name}.silk")
+            ok, elapsed, speed = throughput(
+                lambda: backend.encode_silk(pcm, audio.PCM_SAMPLE_RATE, silk_path), args.runs, args.seconds)
+            print(f"{backend.name:<10} encode {elapsed * 1000:8.1f} ms/clip  {speed:7.1f}x realtime  ok={ok}")
+
+            ok, elapsed, speed = throughput(
+                lambda: bool(backend.decode(wav_path)), args.runs, args.seconds)
+            print(f"{backend.name:<10} decode {elapsed * 1000:8.1f} ms/clip  {speed:7.1f}x realtime  ok={ok}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
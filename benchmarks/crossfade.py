@@ -0,0 +1,52 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QGuiApplication, QPixmap
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+pixmaps = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.pixmaps")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="表情渐变过渡的每次CPU开销（离屏）")
+    parser.add_argument('--image-dir', default=os.path.join(PLUGIN_DIR, 'image'))
+    parser.add_argument('--size', type=int, nargs=2, default=[240, 320])
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--transition-ms', type=int, default=200)
+    parser.add_argument('--transitions', type=int, default=50)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv[:1])
+    files = [f for f in sorted(os.listdir(args.image_dir)) if f.lower().endswith('.png')]
+    frames = [
+        QPixmap(os.path.join(args.image_dir, f)).scaled(args.size[0], args.size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        for f in files
+    ]
+    frames_per_transition = max(1, args.transition_ms * args.fps // 1000)
+
+    start_cpu = time.process_time()
+    start_wall = time.perf_counter()
+    for i in range(args.transitions):
+        from_pixmap = frames[i % len(frames)]
+        to_pixmap = frames[(i + 1) % len(frames)]
+        for frame in range(1, frames_per_transition + 1):
+            pixmaps.blend_frame(from_pixmap, to_pixmap, frame / (frames_per_transition + 1))
+    cpu = (time.process_time() - start_cpu) / args.transitions
+    wall = (time.perf_counter() - start_wall) / args.transitions
+
+    print(f"{args.size[0]}x{args.size[1]} @ {args.fps} fps, {args.transition_ms} ms, {frames_per_transition} 帧/次")
+    print(f"每次过渡 CPU {cpu * 1000:7.2f} ms  墙钟 {wall * 1000:7.2f} ms  "
+          f"占用 {cpu * 1000 / args.transition_ms * 100:5.1f}% (过渡期间)")
+    del app
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
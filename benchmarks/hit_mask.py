@@ -0,0 +1,64 @@
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtGui import QGuiApplication, QPixmap
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+pixmaps = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.pixmaps")
+
+
+def resize_steps(width, height, steps):
+    sizes = []
+    for factor in [1.1] * steps + [0.9] * steps:
+        width, height = max(100, int(width * factor)), max(100, int(height * factor))
+        sizes.append((width, height))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缩放时生成透明遮罩/点击区域的耗时")
+    parser.add_argument('--image-dir', default=os.path.join(PLUGIN_DIR, 'image'))
+    parser.add_argument('--size', type=int, nargs=2, default=[240, 320])
+    parser.add_argument('--steps', type=int, default=8)
+    parser.add_argument('--lookups', type=int, default=100000)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv[:1])
+    files = [f for f in sorted(os.listdir(args.image_dir)) if f.lower().endswith('.png')]
+    sizes = resize_steps(args.size[0], args.size[1], args.steps)
+
+    build_times = []
+    lookup_times = []
+    for file in files:
+        source = QPixmap(os.path.join(args.image_dir, file))
+        for width, height in sizes:
+            start = time.perf_counter()
+            entry = pixmaps.build_entry(source, width, height)
+            build_times.append(time.perf_counter() - start)
+
+        points = [(random.randrange(entry.pixmap.width()), random.randrange(entry.pixmap.height()))
+                  for _ in range(args.lookups)]
+        start = time.perf_counter()
+        for x, y in points:
+            entry.hit_test(x, y)
+        lookup_times.append((time.perf_counter() - start) / args.lookups)
+
+    build_times.sort()
+    count = len(build_times)
+    print(f"{len(files)} 张图片 × {len(sizes)} 个尺寸")
+    print(f"遮罩生成  平均 {sum(build_times) / count * 1000:7.2f} ms  "
+          f"p50 {build_times[count // 2] * 1000:7.2f} ms  p95 {build_times[int(count * 0.95)] * 1000:7.2f} ms")
+    print(f"点击检测  平均 {sum(lookup_times) / len(lookup_times) * 1e9:7.1f} ns/次")
+    del app
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
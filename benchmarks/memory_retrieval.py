@@ -0,0 +1,66 @@
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+memory = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.memory")
+
+SUBJECTS = ['我', '你', '我们', '妈妈', '同学', '老板', '猫咪', '小狗']
+VERBS = ['喜欢', '讨厌', '想吃', '买了', '看见', '忘记', '梦到', '聊起']
+OBJECTS = ['草莓蛋糕', '奶茶', '火锅', '电影', '游戏', '考试', '雨天', '旅行', '音乐会', '新衣服',
+           '周末', '生日', '加班', '跑步', '图书馆', '海边', '烧烤', '钢琴', '感冒', '搬家']
+REPLIES = ['听起来不错呢', '下次一起吧', '要注意休息哦', '好羡慕呀', '真的吗', '我记住啦']
+
+
+def make_turn(rng):
+    user_text = f"{rng.choice(SUBJECTS)}{rng.choice(VERBS)}{rng.choice(OBJECTS)}，还有{rng.choice(OBJECTS)}"
+    return user_text, f"{rng.choice(REPLIES)}，{rng.choice(OBJECTS)}"
+
+
+def measure(index, queries, k, max_postings, budget_ms):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000.0 if budget_ms else None
+        index.search(query, k, max_postings, deadline)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return (latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000,
+            latencies[-1] * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长期记忆倒排索引在不同对话量下的检索延迟")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--max-postings', type=int, default=20000)
+    parser.add_argument('--time-budget-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = [make_turn(rng)[0] for _ in range(args.queries)]
+
+    for size in args.sizes:
+        index = memory.UserIndex()
+        start = time.perf_counter()
+        for row_id in range(size):
+            user_text, reply_text = make_turn(rng)
+            index.add(row_id, f"{user_text} {reply_text}")
+        build = time.perf_counter() - start
+
+        bounded = measure(index, queries, args.top_k, args.max_postings, args.time_budget_ms)
+        full = measure(index, queries[:20], args.top_k, size, None)
+        print(f"{size:>8} 条  建索引 {build:6.1f} s ({size / build:8.0f} 条/s)")
+        print(f"         有上限 p50 {bounded[0]:7.2f} ms  p95 {bounded[1]:7.2f} ms  max {bounded[2]:7.2f} ms")
+        print(f"         全量   p50 {full[0]:7.2f} ms  p95 {full[1]:7.2f} ms  max {full[2]:7.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import argparse
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+message_store = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.message_store")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="消息记录库批量写入吞吐与未读查询延迟")
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--launchers', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = message_store.MessageStore(os.path.join(workdir, 'messages.db'))
+        now = time.time()
+
+        start = time.perf_counter()
+        max_enqueue = 0.0
+        for i in range(args.messages):
+            enqueue_start = time.perf_counter()
+            store.record('person', random.randrange(args.launchers), random.randrange(1000), 'in',
+                         f"消息 {i}", now - args.messages + i, read=random.random() < 0.7)
+            max_enqueue = max(max_enqueue, time.perf_counter() - enqueue_start)
+        enqueued = time.perf_counter() - start
+        store.flush()
+        durable = time.perf_counter() - start
+
+        print(f"{args.messages} 条消息")
+        print(f"入队   {args.messages / enqueued:10.0f} 条/s  单次最大 {max_enqueue * 1e6:7.1f} µs")
+        print(f"落盘   {args.messages / durable:10.0f} 条/s  {store.batches} 批")
+
+        latencies = []
+        for _ in range(args.queries):
+            since = now - random.randrange(args.messages)
+            query_start = time.perf_counter()
+            store.count_unread_since(since)
+            store.unread_since(since, random.randrange(args.launchers), limit=20)
+            latencies.append(time.perf_counter() - query_start)
+        latencies.sort()
+        print(f"未读查询 p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms")
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
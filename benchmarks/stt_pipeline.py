@@ -0,0 +1,98 @@
+import argparse
+import importlib
+import json
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+audio = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.audio")
+stt = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.stt")
+
+
+def make_voice(seconds, sample_rate=stt.STT_SAMPLE_RATE):
+    frames = []
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        speaking = (t % 4.0) < 2.5 and t > 0.8
+        if speaking:
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+            value = envelope * (0.6 * math.sin(2 * math.pi * 220 * t) + 0.3 * math.sin(2 * math.pi * 660 * t)) * 12000
+        else:
+            value = 40 * math.sin(2 * math.pi * 50 * t)
+        frames.append(int(value))
+    return struct.pack(f"<{len(frames)}h", *frames)
+
+
+def stand_in_server(base_latency, processing_rtf):
+    stats = {'requests': 0, 'bytes': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            seconds = len(body) / float(stt.STT_SAMPLE_RATE * audio.PCM_SAMPLE_WIDTH)
+            with lock:
+                stats['requests'] += 1
+                stats['bytes'] += len(body)
+            time.sleep(base_latency + seconds * processing_rtf)
+            data = json.dumps({'text': f"[{seconds:.1f}s]"}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音转文本管线：静音裁剪、分段并发上传与缓存的实时率")
+    parser.add_argument('--seconds', type=float, default=40)
+    parser.add_argument('--base-latency', type=float, default=0.3)
+    parser.add_argument('--processing-rtf', type=float, default=0.1)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--max-chunk-seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    server, stats = stand_in_server(args.base_latency, args.processing_rtf)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    pcm = make_voice(args.seconds)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        voice_path = os.path.join(workdir, 'voice.wav')
+        audio.write_wav(voice_path, pcm, stt.STT_SAMPLE_RATE)
+
+        cases = [
+            ('整段上传', {'vad': False, 'concurrency': 1, 'max_chunk_seconds': args.seconds + 1}),
+            ('裁剪+分段并发', {'vad': True, 'concurrency': args.concurrency, 'max_chunk_seconds': args.max_chunk_seconds}),
+        ]
+        print(f"音频 {args.seconds:.1f} s，服务端延迟 {args.base_latency * 1000:.0f} ms + {args.processing_rtf} x 时长")
+        for name, options in cases:
+            cache_dir = os.path.join(workdir, name)
+            engine = stt.QhaiSTT(dict(options, api_url=url, cache_dir=cache_dir))
+            stats['requests'] = stats['bytes'] = 0
+            result = engine.transcribe_file(voice_path)
+            cached = engine.transcribe_file(voice_path)
+            print(f"{name:8s} 耗时 {result.elapsed * 1000:8.1f} ms  实时率 {result.elapsed / args.seconds:6.3f}  "
+                  f"{result.chunks} 段  上传 {stats['bytes'] / 1024:7.1f} KB  "
+                  f"缓存命中 {cached.elapsed * 1000:6.2f} ms")
+            engine.close()
+
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
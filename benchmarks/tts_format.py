@@ -0,0 +1,120 @@
+import argparse
+import importlib
+import math
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+audio = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.audio")
+
+
+def find_binary(name):
+    for candidate in (f"{name}.exe", name):
+        path = os.path.join(PLUGIN_DIR, 'ffmpeg', candidate)
+        if os.path.exists(path) and os.access(path, os.X_OK):
+            return path
+    return shutil.which(name)
+
+
+def make_utterance(seconds, sample_rate=audio.PCM_SAMPLE_RATE):
+    frames = []
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+        value = envelope * (0.6 * math.sin(2 * math.pi * 220 * t) + 0.3 * math.sin(2 * math.pi * 660 * t))
+        frames.append(int(value * 12000))
+    return struct.pack(f"<{len(frames)}h", *frames)
+
+
+def cpu_time():
+    own = time.process_time()
+    if resource is None:
+        return own
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own + children.ru_utime + children.ru_stime
+
+
+def run(args):
+    return subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False).returncode == 0
+
+
+def legacy_path(workdir, mp3_data, ffmpeg, encoder):
+    mp3_path = os.path.join(workdir, 'legacy.mp3')
+    pcm_path = f"{mp3_path}.pcm"
+    silk_path = f"{mp3_path}.silk"
+    with open(mp3_path, 'wb') as f:
+        f.write(mp3_data)
+    written = len(mp3_data)
+    run([ffmpeg, '-y', '-i', mp3_path, '-f', 's16le', '-ar', '24000', '-ac', '1', pcm_path])
+    written += os.path.getsize(pcm_path)
+    run([encoder, pcm_path, silk_path, '-rate', '24000', '-tencent', '-quiet'])
+    os.remove(pcm_path)
+    written += os.path.getsize(silk_path)
+    return written, os.path.getsize(mp3_path) + os.path.getsize(silk_path)
+
+
+def direct_path(workdir, pcm, encoder):
+    wav_path = os.path.join(workdir, 'direct.wav')
+    pcm_path = f"{wav_path}.pcm"
+    silk_path = f"{wav_path}.silk"
+    audio.write_wav(wav_path, pcm)
+    with open(pcm_path, 'wb') as f:
+        f.write(pcm)
+    written = os.path.getsize(wav_path) + len(pcm)
+    run([encoder, pcm_path, silk_path, '-rate', '24000', '-tencent', '-quiet'])
+    os.remove(pcm_path)
+    written += os.path.getsize(silk_path)
+    return written, os.path.getsize(wav_path) + os.path.getsize(silk_path)
+
+
+def measure(name, runs, func, *args):
+    start_cpu, start_wall = cpu_time(), time.perf_counter()
+    written = kept = 0
+    for _ in range(runs):
+        written, kept = func(*args)
+    cpu = (cpu_time() - start_cpu) / runs
+    wall = (time.perf_counter() - start_wall) / runs
+    print(f"{name:<8} cpu {cpu * 1000:8.1f} ms  wall {wall * 1000:8.1f} ms  "
+          f"written {written / 1024:8.1f} KiB  kept {kept / 1024:8.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 mp3→PCM→silk 与直接PCM→silk 的每句开销")
+    parser.add_argument('--seconds', type=float, default=4.0)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    ffmpeg = find_binary('ffmpeg')
+    encoder = find_binary('silk_v3_encoder')
+    if not ffmpeg or not encoder:
+        print("缺少 ffmpeg 或 silk_v3_encoder，无法运行基准测试")
+        return 1
+
+    pcm = make_utterance(args.seconds)
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, 'source.wav')
+        audio.write_wav(source, pcm)
+        mp3_path = os.path.join(workdir, 'source.mp3')
+        run([ffmpeg, '-y', '-i', source, '-b:a', '64k', mp3_path])
+        with open(mp3_path, 'rb') as f:
+            mp3_data = f.read()
+
+        print(f"utterance {args.seconds:.1f}s, {args.runs} runs")
+        measure('mp3', args.runs, legacy_path, workdir, mp3_data, ffmpeg, encoder)
+        measure('pcm', args.runs, direct_path, workdir, pcm, encoder)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
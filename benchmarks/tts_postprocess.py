@@ -0,0 +1,52 @@
+import argparse
+import importlib
+import math
+import os
+import struct
+import sys
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+audio = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.audio")
+
+
+def make_clip(seconds, lead, tail, volume, sample_rate=audio.PCM_SAMPLE_RATE):
+    frames = []
+    total = lead + seconds + tail
+    for i in range(int(total * sample_rate)):
+        t = i / sample_rate
+        if lead <= t < lead + seconds:
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+            value = envelope * (0.6 * math.sin(2 * math.pi * 220 * t) + 0.3 * math.sin(2 * math.pi * 660 * t))
+            frames.append(int(value * 32767 * volume))
+        else:
+            frames.append(int(20 * math.sin(2 * math.pi * 50 * t)))
+    return struct.pack(f"<{len(frames)}h", *frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS语音首尾静音裁剪与响度归一化的耗时和节省量")
+    parser.add_argument('--seconds', type=float, default=4)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    clips = [
+        ('首尾静音 0.6/0.8s, 音量 0.2', make_clip(args.seconds, 0.6, 0.8, 0.2)),
+        ('首尾静音 0.3/0.3s, 音量 0.9', make_clip(args.seconds, 0.3, 0.3, 0.9)),
+        ('无静音,   音量 0.05', make_clip(args.seconds, 0.0, 0.0, 0.05)),
+    ]
+    print(f"实现: {'numpy 向量化' if audio.np is not None else ('audioop 逐帧' if audio.audioop else '纯Python')}")
+    for name, pcm in clips:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            processed, gain = audio.trim_and_normalize(pcm)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        saved_ms = (audio.pcm_duration(pcm) - audio.pcm_duration(processed)) * 1000
+        print(f"{name:24s} 处理 {elapsed * 1000:6.2f} ms  节省 {len(pcm) - len(processed):7d} B / {saved_ms:6.0f} ms  "
+              f"增益 {20 * math.log10(gain):+5.1f} dB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
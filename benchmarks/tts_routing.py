@@ -0,0 +1,140 @@
+import argparse
+import importlib
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+tts = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.tts")
+
+CLIP = struct.pack('<2400h', *([0, 1200, 2400, 1200, 0, -1200, -2400, -1200] * 300))
+
+
+def stand_in_server(name, latency, jitter, tail_rate, tail_latency, error_rate, seed):
+    stats = {'name': name, 'requests': 0, 'errors': 0, 'aborted': 0}
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            with lock:
+                stats['requests'] += 1
+                roll = rng.random()
+                delay = latency + rng.uniform(0, jitter)
+                if rng.random() < tail_rate:
+                    delay = tail_latency
+            time.sleep(delay)
+            try:
+                if roll < error_rate:
+                    with lock:
+                        stats['errors'] += 1
+                    self.send_response(503)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', '2')
+                    self.end_headers()
+                    self.wfile.write(b'{}')
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/pcm')
+                self.send_header('Content-Length', str(len(CLIP)))
+                self.end_headers()
+                self.wfile.write(CLIP)
+            except OSError:
+                with lock:
+                    stats['aborted'] += 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def run_case(servers, hedge, requests, hedge_after_ms, cache_dir):
+    endpoints = [
+        {'api_url': f"http://127.0.0.1:{server.server_address[1]}", 'name': stats['name']}
+        for server, stats in servers
+    ]
+    engine = tts.QhaiTTS({
+        'api_key': 'bench',
+        'model': 'qhai-tts:bench',
+        'response_format': 'pcm',
+        'cache_dir': cache_dir,
+        'post_process': {'enabled': False},
+        'endpoints': endpoints,
+        'routing': {'hedge': hedge, 'hedge_after_ms': hedge_after_ms, 'timeout': 10},
+    })
+    latencies = []
+    failures = 0
+    for i in range(requests):
+        start = time.perf_counter()
+        result = engine.synthesize(f"第{i}句测试语音{random.random()}")
+        if result is None:
+            failures += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+    stats = engine.router.stats()
+    engine.close()
+    return latencies, failures, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多TTS服务路由与对冲请求：本地替身服务下的延迟分布")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--hedge-after-ms', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    servers = [
+        stand_in_server('fast-tail', 0.06, 0.02, 0.03, 1.2, 0.0, args.seed),
+        stand_in_server('steady', 0.15, 0.03, 0.0, 0.0, 0.0, args.seed + 1),
+        stand_in_server('flaky', 0.05, 0.02, 0.0, 0.0, 0.3, args.seed + 2),
+    ]
+    cases = [
+        ('单服务', servers[:1], False),
+        ('路由', servers, False),
+        ('路由+对冲', servers, True),
+    ]
+
+    print(f"每种方式 {args.requests} 次合成；替身服务：fast-tail 60ms(3%为1.2s)，steady 150ms，flaky 50ms(30%返回503)")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, case_servers, hedge in cases:
+            for _, stats in servers:
+                stats['requests'] = stats['errors'] = stats['aborted'] = 0
+            latencies, failures, routing = run_case(
+                case_servers, hedge, args.requests, args.hedge_after_ms, os.path.join(workdir, name)
+            )
+            print(f"{name:8s} p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  max {max(latencies or [0]) * 1000:7.1f} ms  "
+                  f"失败 {failures}  对冲 {routing['hedges']} ({routing['hedge_rate'] * 100:.1f}%，胜出 {routing['hedge_wins']})  "
+                  f"故障转移 {routing['failovers']}  探测 {routing['probes']}")
+            for endpoint in routing['endpoints']:
+                latency = endpoint['latency_ms']
+                print(f"    {endpoint['name']:10s} 请求 {endpoint['requests']:4d}  采用 {endpoint['wins']:4d}  "
+                      f"取消 {endpoint['cancelled']:3d}  错误率 {endpoint['error_rate']:.2f}  "
+                      f"平均延迟 {latency if latency is not None else 0:7.1f} ms")
+
+    for server, _ in servers:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+
+import yaml
+from PyQt5.QtCore import QT_VERSION_STR, qInstallMessageHandler
+from PyQt5.QtWidgets import QApplication
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+ui = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.ui")
+headless = importlib.import_module(f"{os.path.basename(PLUGIN_DIR)}.headless")
+
+COMPARED = [
+    ('render_ms', 'p50'), ('render_ms', 'p95'),
+    ('image_paint_ms', 'p95'), ('bubble_paint_ms', 'p95'),
+    ('frame_ms', 'avg'), ('frame_ms', 'p95'),
+    ('first_glyph_ms', 'p50'),
+    ('pixmap_cache', 'hit_rate'),
+    ('rss_mb', 'peak'),
+]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PLUGIN_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(baseline, report):
+    print(f"{'指标':24s} {baseline.get('commit') or '基线':>10s} {report.get('commit') or '当前':>10s}   变化")
+    for section, key in COMPARED:
+        old = baseline.get(section, {}).get(key)
+        new = report.get(section, {}).get(key)
+        if old is None or new is None:
+            continue
+        change = f"{(new - old) / old * 100:+6.1f}%" if old else '   -'
+        print(f"{section + '.' + key:24s} {old:10.3f} {new:10.3f}   {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离屏回放消息轨迹，记录绘制耗时、帧耗时、缓存命中率和内存")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--trace', help="JSON 格式的消息轨迹，默认使用内置轨迹")
+    parser.add_argument('--output', help="把报告写入 JSON 文件")
+    parser.add_argument('--compare', help="与之前保存的报告对比")
+    parser.add_argument('--cache-size', type=int, help="图片缓存容量，默认按表情数量的两倍设置，使轨迹测量的是缓存命中后的绘制")
+    args = parser.parse_args()
+
+    config_path = os.path.join(PLUGIN_DIR, 'config.yaml')
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config.setdefault('process', {})['headless'] = True
+    config.setdefault('idle', {})['enabled'] = False
+
+    qInstallMessageHandler(lambda *_: None)
+    app = QApplication(sys.argv[:1])
+    msg_queue = queue.Queue()
+    status_queue = queue.Queue()
+    widget = ui.WifeImageWidget(config, msg_queue, config_path, status_queue)
+    widget.pixmap_cache.capacity = args.cache_size or max(widget.pixmap_cache.capacity, len(widget.emotions) * 2)
+    widget.show()
+
+    if args.trace:
+        with open(args.trace, 'r', encoding='utf-8') as f:
+            trace = json.load(f)
+    else:
+        trace = headless.default_trace(list(widget.emotions.keys()) or list(config.get('emotions', {}).keys()),
+                                       args.rounds)
+
+    runner = headless.TraceRunner(widget, msg_queue, status_queue, trace, lambda _: app.quit())
+    runner.start()
+    app.exec_()
+
+    report = runner.report()
+    report.update({
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'trace_items': len(trace),
+    })
+    widget.close()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    cache = report['pixmap_cache']
+    if cache['distinct_keys'] > cache['capacity']:
+        print(f"注意：轨迹用到 {cache['distinct_keys']} 种图片尺寸组合，超过缓存容量 {cache['capacity']}，"
+              f"命中率反映的是缓存抖动", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+from .audio import PCM_SAMPLE_RATE
+
+try:
+    import pysilk
+except ImportError:
+    pysilk = None
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+SILK_BIT_RATE = 24000
+SILK_HEADERS = (b'#!SILK_V3', b'\x02#!SILK_V3')
+
+
+def is_silk(data):
+    return data.startswith(SILK_HEADERS)
+
+
+class CodecBackend:
+    name = 'none'
+    last_error = None
+
+    def available(self):
+        return self.can_decode() and self.can_encode_silk()
+
+    def can_decode(self):
+        return False
+
+    def can_encode_silk(self):
+        return False
+
+    def fail(self, reason):
+        self.last_error = reason
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'decode': self.can_decode(),
+            'encode_silk': self.can_encode_silk(),
+            'decode_silk': self.can_decode_silk(),
+            'last_error': self.last_error,
+        }
+
+    def decode(self, path, sample_rate=PCM_SAMPLE_RATE):
+        return None
+
+    def encode_silk(self, pcm, sample_rate, silk_path):
+        return False
+
+    def decode_silk(self, silk_path, sample_rate=PCM_SAMPLE_RATE):
+        return None
+
+    def can_decode_silk(self):
+        return False
+
+
+class InProcessBackend(CodecBackend):
+    name = 'inprocess'
+
+    def can_decode(self):
+        return miniaudio is not None
+
+    def can_encode_silk(self):
+        return pysilk is not None
+
+    def decode(self, path, sample_rate=PCM_SAMPLE_RATE):
+        if miniaudio is None:
+            self.fail("未安装 miniaudio，无法在进程内解码音频")
+            return None
+        try:
+            decoded = miniaudio.decode_file(
+                path,
+                output_format=miniaudio.SampleFormat.SIGNED16,
+                nchannels=1,
+                sample_rate=sample_rate
+            )
+            return decoded.samples.tobytes()
+        except Exception:
+            return None
+
+    def encode_silk(self, pcm, sample_rate, silk_path):
+        if pysilk is None:
+            self.fail("未安装 silk-python，无法在进程内编码silk")
+            return False
+        try:
+            output = io.BytesIO()
+            pysilk.encode(io.BytesIO(pcm), output, sample_rate, SILK_BIT_RATE, tencent=True)
+            data = output.getvalue()
+            if not data:
+                return False
+            with open(silk_path, 'wb') as f:
+                f.write(data)
+            return True
+        except Exception:
+            return False
+
+    def can_decode_silk(self):
+        return pysilk is not None
+
+    def decode_silk(self, silk_path, sample_rate=PCM_SAMPLE_RATE):
+        if pysilk is None:
+            self.fail("未安装 silk-python，无法在进程内解码silk")
+            return None
+        try:
+            output = io.BytesIO()
+            with open(silk_path, 'rb') as f:
+                pysilk.decode(f, output, sample_rate)
+            return output.getvalue() or None
+        except Exception:
+            return None
+
+
+class SubprocessBackend(CodecBackend):
+    name = 'subprocess'
+
+    def __init__(self, plugin_dir, ffmpeg_path='', encoder_path='', decoder_path=''):
+        self.tools_dir = os.path.join(plugin_dir, 'ffmpeg')
+        self.ffmpeg_path = ffmpeg_path or self.find_binary('ffmpeg')
+        self.encoder_path = encoder_path or self.find_binary('silk_v3_encoder')
+        self.decoder_path = decoder_path or self.find_binary('silk_v3_decoder')
+
+    def find_binary(self, name):
+        for candidate in (f"{name}.exe", name):
+            path = os.path.join(self.tools_dir, candidate)
+            if os.path.isfile(path) and (os.name == 'nt' or os.access(path, os.X_OK)):
+                return path
+        return shutil.which(name)
+
+    def can_decode(self):
+        return bool(self.ffmpeg_path)
+
+    def can_encode_silk(self):
+        return bool(self.encoder_path)
+
+    def decode(self, path, sample_rate=PCM_SAMPLE_RATE):
+        if not self.ffmpeg_path:
+            self.fail("找不到 ffmpeg")
+            return None
+        try:
+            result = subprocess.run(
+                [
+                    self.ffmpeg_path,
+                    '-y',
+                    '-i', path,
+                    '-f', 's16le',
+                    '-ar', str(sample_rate),
+                    '-ac', '1',
+                    'pipe:1'
+                ],
+                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=False,
+                check=False
+            )
+            if result.returncode != 0 or not result.stdout:
+                return None
+            return result.stdout
+        except Exception:
+            return None
+
+    def encode_silk(self, pcm, sample_rate, silk_path):
+        if not self.encoder_path:
+            self.fail("找不到 silk_v3_encoder")
+            return False
+
+        fd, pcm_file_path = tempfile.mkstemp(suffix='.pcm')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pcm)
+
+            result = subprocess.run(
+                [
+                    self.encoder_path,
+                    pcm_file_path,
+                    silk_path,
+                    "-rate", str(sample_rate),
+                    "-tencent",
+                    "-quiet"
+                ],
+                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=False,
+                check=False
+            )
+            return result.returncode == 0 and os.path.exists(silk_path) and os.path.getsize(silk_path) > 0
+        except Exception:
+            return False
+        finally:
+            if os.path.exists(pcm_file_path):
+                os.remove(pcm_file_path)
+
+    def can_decode_silk(self):
+        return bool(self.decoder_path)
+
+    def decode_silk(self, silk_path, sample_rate=PCM_SAMPLE_RATE):
+        if not self.decoder_path:
+            self.fail("找不到 silk_v3_decoder")
+            return None
+
+        fd, pcm_file_path = tempfile.mkstemp(suffix='.pcm')
+        os.close(fd)
+        try:
+            result = subprocess.run(
+                [
+                    self.decoder_path,
+                    silk_path,
+                    pcm_file_path,
+                    "-Fs_API", str(sample_rate),
+                    "-quiet"
+                ],
+                stderr=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=False,
+                check=False
+            )
+            if result.returncode != 0:
+                return None
+            with open(pcm_file_path, 'rb') as f:
+                return f.read() or None
+        except Exception:
+            return None
+        finally:
+            if os.path.exists(pcm_file_path):
+                os.remove(pcm_file_path)
+
+
+class AutoBackend(CodecBackend):
+    name = 'auto'
+
+    def __init__(self, inprocess, fallback):
+        self.inprocess = inprocess
+        self.fallback = fallback
+
+    @property
+    def last_error(self):
+        return self.inprocess.last_error or self.fallback.last_error
+
+    def can_decode(self):
+        return self.inprocess.can_decode() or self.fallback.can_decode()
+
+    def can_encode_silk(self):
+        return self.inprocess.can_encode_silk() or self.fallback.can_encode_silk()
+
+    def can_decode_silk(self):
+        return self.inprocess.can_decode_silk() or self.fallback.can_decode_silk()
+
+    def decode(self, path, sample_rate=PCM_SAMPLE_RATE):
+        backend = self.inprocess if self.inprocess.can_decode() else self.fallback
+        return backend.decode(path, sample_rate)
+
+    def encode_silk(self, pcm, sample_rate, silk_path):
+        backend = self.inprocess if self.inprocess.can_encode_silk() else self.fallback
+        return backend.encode_silk(pcm, sample_rate, silk_path)
+
+    def decode_silk(self, silk_path, sample_rate=PCM_SAMPLE_RATE):
+        backend = self.inprocess if self.inprocess.can_decode_silk() else self.fallback
+        return backend.decode_silk(silk_path, sample_rate)
+
+
+def create_backend(config, plugin_dir):
+    config = config or {}
+    choice = config.get('backend', 'auto')
+
+    inprocess = InProcessBackend()
+    if choice == 'inprocess':
+        if not inprocess.available():
+            missing = [name for name, module in (('silk-python', pysilk), ('miniaudio', miniaudio)) if module is None]
+            inprocess.fail(f"已指定进程内编解码，但未安装 {', '.join(missing)}")
+        return inprocess
+
+    fallback = SubprocessBackend(
+        plugin_dir,
+        config.get('ffmpeg_path', ''),
+        config.get('encoder_path', ''),
+        config.get('decoder_path', '')
+    )
+    if choice == 'subprocess':
+        return fallback
+    return AutoBackend(inprocess, fallback)
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from pkg.platform.types import message as platform_message
+
+
+class ReplyDispatcher:
+
+    def __init__(self, voice_deadline=30):
+        self.voice_deadline = voice_deadline
+        self.tails = {}
+        self.tasks = set()
+        self.sent_voices = 0
+        self.dropped_voices = 0
+
+    async def dispatch(self, ctx, text, voice_job=None):
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + self.voice_deadline
+        launcher_type = ctx.event.launcher_type
+        launcher_id = ctx.event.launcher_id
+
+        voice_future = loop.run_in_executor(None, voice_job, deadline) if voice_job else None
+
+        try:
+            await ctx.send_message(launcher_type, launcher_id, [platform_message.Plain(text)])
+        except Exception:
+            pass
+
+        if not voice_future:
+            return
+
+        key = (str(launcher_type), str(launcher_id))
+        previous = self.tails.get(key)
+        done = loop.create_future()
+        self.tails[key] = done
+        done.add_done_callback(lambda future: self.release(key, future))
+
+        task = asyncio.ensure_future(self.send_voice(ctx, voice_future, deadline, previous, done))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def send_voice(self, ctx, voice_future, deadline, previous, done):
+        try:
+            if previous:
+                await asyncio.wait_for(asyncio.shield(previous), max(deadline - time.monotonic(), 0))
+            silk_path = await asyncio.wait_for(voice_future, max(deadline - time.monotonic(), 0))
+            if silk_path:
+                await ctx.send_message(
+                    ctx.event.launcher_type,
+                    ctx.event.launcher_id,
+                    [platform_message.Voice(path=silk_path)]
+                )
+                self.sent_voices += 1
+        except asyncio.TimeoutError:
+            self.dropped_voices += 1
+        except Exception:
+            pass
+        finally:
+            if not done.done():
+                done.set_result(None)
+
+    def release(self, key, future):
+        if self.tails.get(key) is future:
+            del self.tails[key]
+
+    def stats(self):
+        return {
+            'pending': len(self.tasks),
+            'sent_voices': self.sent_voices,
+            'dropped_voices': self.dropped_voices,
+        }
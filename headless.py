@@ -0,0 +1,200 @@
+import time
+import queue
+from PyQt5.QtCore import Qt, QEvent, QPoint, QPointF, QTimer
+from PyQt5.QtGui import QMouseEvent, QWheelEvent
+from PyQt5.QtWidgets import QApplication
+from .assets import current_rss
+
+
+def default_trace(emotions, rounds=3):
+    trace = []
+    for r in range(rounds):
+        for i, emotion in enumerate(emotions):
+            trace.append({'type': 'emotion', 'content': emotion, 'wait': 250})
+            if i % 3 == 0:
+                trace.append({'type': 'message', 'content': f"第{r + 1}轮第{i + 1}句：今天也要开开心心的哦~", 'wait': 150})
+            if i % 5 == 0:
+                trace.append({'type': 'stream', 'content': "流式输出的回复会一小段一小段地出现在气泡里，直到整句话说完。",
+                              'chunk': 4, 'wait': 30})
+        trace.append({'type': 'drag', 'dx': 200, 'dy': -120, 'steps': 60, 'wait': 8})
+        trace.append({'type': 'wheel', 'delta': 120, 'steps': 6, 'wait': 30})
+        trace.append({'type': 'wheel', 'delta': -120, 'steps': 6, 'wait': 30})
+        trace.append({'type': 'restore_size'})
+        trace.append({'type': 'wait', 'wait': 400})
+    return trace
+
+
+def summarize(values, scale=1000.0):
+    values = sorted(v * scale for v in values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'avg': sum(values) / len(values),
+        'p50': values[len(values) // 2],
+        'p95': values[int(len(values) * 0.95)],
+        'max': values[-1],
+    }
+
+
+class TraceRunner:
+
+    def __init__(self, widget, msg_queue, status_queue, trace, on_finished=None):
+        self.widget = widget
+        self.msg_queue = msg_queue
+        self.status_queue = status_queue
+        self.trace = trace
+        self.on_finished = on_finished
+        self.steps = self.expand()
+        self.render_times = []
+        self.rss = []
+        self.statuses = []
+        self.started = None
+        self.finished = None
+        self.initial_size = None
+        self.actions = 0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.initial_size = (self.widget.width(), self.widget.height())
+        self.rss.append(current_rss())
+        QTimer.singleShot(0, self.step)
+
+    def step(self):
+        try:
+            action, wait = next(self.steps)
+        except StopIteration:
+            QTimer.singleShot(500, self.finish)
+            return
+        if action is not None:
+            action()
+            self.actions += 1
+        self.drain()
+        QTimer.singleShot(wait, self.step)
+
+    def finish(self):
+        self.drain()
+        self.finished = time.perf_counter()
+        self.rss.append(current_rss())
+        if self.on_finished:
+            self.on_finished(self)
+
+    def drain(self):
+        while True:
+            try:
+                self.statuses.append(self.status_queue.get_nowait())
+            except queue.Empty:
+                break
+            except Exception:
+                break
+
+    def send(self, msg_type, content):
+        self.msg_queue.put({'type': msg_type, 'content': content, 'timestamp': time.time()})
+
+    def render(self):
+        start = time.perf_counter()
+        self.widget.grab()
+        if self.widget.text_bubble.isVisible():
+            self.widget.text_bubble.grab()
+        self.render_times.append(time.perf_counter() - start)
+        self.rss.append(current_rss())
+
+    def expand(self):
+        for item in self.trace:
+            kind = item.get('type')
+            wait = item.get('wait', 100)
+            if kind in ('emotion', 'message'):
+                yield lambda item=item, kind=kind: self.send(kind, item['content']), wait
+                yield self.render, 0
+            elif kind == 'stream':
+                text = item['content']
+                size = item.get('chunk', 4)
+                started = time.time()
+                for offset in range(0, len(text), size):
+                    chunk = {'text': text[offset:offset + size], 'reset': offset == 0,
+                             'started': started, 'first_chunk': started}
+                    yield lambda chunk=chunk: self.send('message_chunk', chunk), wait
+                yield self.render, 0
+            elif kind == 'drag':
+                yield from self.drag(item.get('dx', 100), item.get('dy', 0), item.get('steps', 30), wait)
+                yield self.render, 0
+            elif kind == 'wheel':
+                for _ in range(item.get('steps', 5)):
+                    yield lambda item=item: self.wheel(item.get('delta', 120)), wait
+                yield None, self.widget.settle_timer.interval() + 50
+                yield self.render, 0
+            elif kind == 'restore_size':
+                yield self.restore_size, self.widget.settle_timer.interval() + 50
+                yield self.render, 0
+            else:
+                yield None, wait
+
+    def grab_point(self):
+        for y in range(self.widget.height() // 2, self.widget.height(), 8):
+            for x in range(self.widget.width() // 2, self.widget.width(), 8):
+                point = QPoint(x, y)
+                if self.widget.hit_test(point)[0]:
+                    return point
+        return QPoint(self.widget.width() // 2, self.widget.height() // 2)
+
+    def mouse(self, event_type, global_pos, button, buttons):
+        local = self.widget.mapFromGlobal(global_pos)
+        event = QMouseEvent(event_type, QPointF(local), QPointF(global_pos), button, buttons, Qt.NoModifier)
+        QApplication.sendEvent(self.widget, event)
+
+    def drag(self, dx, dy, steps, wait):
+        state = {}
+
+        def press():
+            state['origin'] = self.widget.mapToGlobal(self.grab_point())
+            self.mouse(QEvent.MouseButtonPress, state['origin'], Qt.LeftButton, Qt.LeftButton)
+
+        def move(i):
+            offset = QPoint(int(dx * i / steps), int(dy * i / steps))
+            self.mouse(QEvent.MouseMove, state['origin'] + offset, Qt.NoButton, Qt.LeftButton)
+
+        yield press, wait
+        for i in range(1, steps + 1):
+            yield lambda i=i: move(i), wait
+        yield lambda: self.mouse(QEvent.MouseButtonRelease, state['origin'] + QPoint(dx, dy),
+                                 Qt.LeftButton, Qt.NoButton), wait
+
+    def wheel(self, delta):
+        local = QPointF(self.widget.width() / 2, self.widget.height() / 2)
+        event = QWheelEvent(local, QPointF(self.widget.mapToGlobal(local.toPoint())), QPoint(), QPoint(0, delta),
+                            Qt.NoButton, Qt.NoModifier, Qt.NoScrollPhase, False)
+        QApplication.sendEvent(self.widget, event)
+
+    def restore_size(self):
+        self.widget.pending_size = self.initial_size
+        self.widget.resizing = True
+        self.widget.settle_timer.start()
+        self.widget.schedule_frame()
+
+    def report(self):
+        frames = [s['content'] for s in self.statuses if s.get('type') == 'frame_stats']
+        glyphs = [s['content'] for s in self.statuses if s.get('type') == 'first_glyph']
+        rss = [value for value in self.rss if value]
+        widget = self.widget
+        return {
+            'actions': self.actions,
+            'wall_s': (self.finished or time.perf_counter()) - self.started,
+            'render_ms': summarize(self.render_times),
+            'image_paint_ms': summarize(widget.image_label.paint_times),
+            'bubble_paint_ms': summarize(widget.text_bubble.paint_times),
+            'frame_ms': {
+                'frames': sum(f['frames'] for f in frames),
+                'avg': sum(f['avg_ms'] * f['frames'] for f in frames) / max(1, sum(f['frames'] for f in frames)),
+                'p95': max([f['p95_ms'] for f in frames] or [0]),
+                'max': max([f['max_ms'] for f in frames] or [0]),
+                'coalesced': sum(f['coalesced'] for f in frames),
+            },
+            'first_glyph_ms': summarize([g.get('from_chunk_ms', 0) / 1000 for g in glyphs]),
+            'pixmap_cache': widget.pixmap_cache.stats(),
+            'transitions': widget.transitions,
+            'rss_mb': {
+                'start': rss[0] / 1048576 if rss else None,
+                'peak': max(rss) / 1048576 if rss else None,
+                'end': rss[-1] / 1048576 if rss else None,
+            },
+        }
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+from collections import deque
+
+
+def windows_idle_seconds():
+    import ctypes
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return 0.0
+    millis = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+    return millis / 1000.0
+
+
+def macos_idle_source():
+    import ctypes
+    import ctypes.util
+
+    quartz = ctypes.cdll.LoadLibrary(ctypes.util.find_library('ApplicationServices'))
+    since_last_event = quartz.CGEventSourceSecondsSinceLastEventType
+    since_last_event.argtypes = [ctypes.c_int32, ctypes.c_uint32]
+    since_last_event.restype = ctypes.c_double
+
+    def idle_seconds():
+        return since_last_event(1, 0xFFFFFFFF)
+    return idle_seconds
+
+
+def x11_idle_source():
+    import ctypes
+    import ctypes.util
+
+    class XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [('window', ctypes.c_ulong), ('state', ctypes.c_int), ('kind', ctypes.c_int),
+                    ('til_or_since', ctypes.c_ulong), ('idle', ctypes.c_ulong), ('event_mask', ctypes.c_ulong)]
+
+    xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library('X11'))
+    xss = ctypes.cdll.LoadLibrary(ctypes.util.find_library('Xss'))
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+    xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+
+    display = xlib.XOpenDisplay(None)
+    if not display:
+        raise OSError('无法连接X服务器')
+    root = xlib.XDefaultRootWindow(display)
+    info = xss.XScreenSaverAllocInfo()
+
+    def idle_seconds():
+        if not xss.XScreenSaverQueryInfo(display, root, info):
+            return 0.0
+        return info.contents.idle / 1000.0
+    return idle_seconds
+
+
+class PositionIdleSource:
+
+    def __init__(self, get_position, clock=time.monotonic):
+        self.get_position = get_position
+        self.clock = clock
+        self.last_position = None
+        self.last_input = clock()
+
+    def __call__(self):
+        position = self.get_position()
+        now = self.clock()
+        if position != self.last_position:
+            self.last_position = position
+            self.last_input = now
+        return now - self.last_input
+
+
+def default_idle_source(get_position):
+    if sys.platform == 'win32':
+        try:
+            windows_idle_seconds()
+            return windows_idle_seconds
+        except Exception:
+            pass
+    elif sys.platform == 'darwin':
+        try:
+            source = macos_idle_source()
+            source()
+            return source
+        except Exception:
+            pass
+    elif os.environ.get('DISPLAY'):
+        try:
+            source = x11_idle_source()
+            source()
+            return source
+        except Exception:
+            pass
+    return PositionIdleSource(get_position)
+
+
+class WakeupCounter:
+
+    def __init__(self, clock=time.monotonic, window=60):
+        self.clock = clock
+        self.window = window
+        self.wakeups = deque()
+
+    def tick(self):
+        now = self.clock()
+        self.wakeups.append(now)
+        self.expire(now)
+
+    def expire(self, now):
+        while self.wakeups and now - self.wakeups[0] > self.window:
+            self.wakeups.popleft()
+
+    def per_minute(self):
+        self.expire(self.clock())
+        return len(self.wakeups) * 60.0 / self.window
+
+
+class IdleMonitor:
+
+    def __init__(self, idle_source, clock=time.monotonic, threshold=300,
+                 min_interval=1.0, max_interval=30.0, idle_max_interval=5.0):
+        self.idle_source = idle_source
+        self.clock = clock
+        self.threshold = threshold
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_max_interval = idle_max_interval
+
+        self.idle = False
+        self.idle_since = None
+        self.interval = min_interval
+        self.listeners = []
+        self.wakeups = WakeupCounter(clock)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def sample(self):
+        now = self.clock()
+        self.wakeups.tick()
+        idle_seconds = self.idle_source()
+        idle = idle_seconds >= self.threshold
+
+        changed = idle != self.idle
+        if changed:
+            self.idle = idle
+            self.idle_since = now - idle_seconds if idle else None
+            for listener in self.listeners:
+                listener(idle, idle_seconds)
+
+        if idle:
+            self.interval = self.min_interval if changed else min(self.interval * 2, self.idle_max_interval)
+        else:
+            self.interval = min(max(self.threshold - idle_seconds, self.min_interval), self.max_interval)
+        return self.interval
+
+    def wakeups_per_minute(self):
+        return self.wakeups.per_minute()
@@ -1,23 +1,28 @@
 import os
 import re
+import asyncio
 import yaml
 import json
-import multiprocessing
 import time
-import subprocess
 import threading
 from pkg.plugin.context import register, handler, BasePlugin, APIHost, EventContext
 from pkg.plugin.events import *
+import pkg.plugin.events as plugin_events
 from pkg.platform.types import message as platform_message
 from pkg.provider import entities as llm_entities
-from .tts import QhaiTTS
+from .audio import read_wav, PCM_SAMPLE_RATE
+from .timing import StartupTimer
+from .assets import load_manifest, IMAGE_EXTENSIONS
+from .dispatch import ReplyDispatcher
+from .stream import EMOTION_PATTERN, StreamState, conversation_key, sender_key, query_text
 
 
-EMOTION_PATTERN = r'\[:([\w\u4e00-\u9fa5]+)\]'
+STREAM_EVENT = getattr(plugin_events, 'NormalMessageChunkResponded', None)
 @register(name="Wife_Image", description="在Windows桌面显示可交互的角色形象", version="0.3", author="小馄饨")
 class WifeImagePlugin(BasePlugin):
     def __init__(self, host: APIHost):
         super().__init__(host)
+        self.startup = StartupTimer()
         self.plugin_dir = os.path.dirname(os.path.abspath(__file__))
         self.config_path = os.path.join(self.plugin_dir, "config.yaml")
         self.emotions_json_path = os.path.join(self.plugin_dir, "emotions.json")
@@ -32,20 +37,21 @@ class WifeImagePlugin(BasePlugin):
         
         self.config = self.load_config()
         self.emotions = {}
-        self.msg_queue = None
-        self.ui_process = None
+        self.supervisor = None
         self.emotion_pattern = re.compile(EMOTION_PATTERN)
-        self.scan_emotions()
-        
         self.tts = None
-        if self.config.get('tts', {}).get('enabled', False):
-            self.tts = QhaiTTS(self.config.get('tts', {}))
-            
-        self.ffmpeg_path = os.path.join(self.plugin_dir, 'ffmpeg', 'ffmpeg.exe')
-        self.encoder_path = os.path.join(self.plugin_dir, 'ffmpeg', 'silk_v3_encoder.exe')
-        
-        self.cleanup_thread = threading.Thread(target=self.cleanup_audio_files, daemon=True)
-        self.cleanup_thread.start()
+        self.stt = None
+        self.codec = None
+        self.cleanup_thread = None
+        self.streams = {}
+        self.message_store = None
+        self.memory = None
+        self.pending_turns = {}
+        self.profiling = False
+        self.profile_waiter = None
+        self.prompt_started = {}
+        self.dispatcher = ReplyDispatcher(self.config.get('tts', {}).get('voice_deadline', 30))
+        self.startup.mark('plugin_init')
     
     def load_config(self):
         try:
@@ -60,21 +66,70 @@ class WifeImagePlugin(BasePlugin):
                                'background_color': 'rgba(255, 255, 255, 0.85)', 
                                'text_color': 'rgb(0, 0, 0)', 'border_radius': 10, 'padding': 10,
                                'max_lines': 5, 'max_chars_per_line': 30},
-                'process': {'use_separate_process': True},
+                'process': {'use_separate_process': True, 'queue_size': 32, 'heartbeat_interval': 2,
+                            'heartbeat_timeout': 15, 'restart_backoff': 1, 'max_restart_backoff': 60,
+                            'start_method': 'spawn', 'headless': False},
                 'position': {'remember': True, 'x': -1, 'y': -1},
                 'emotion_reset': {'auto_reset': True, 'default_emotion': 'happy', 'reset_delay': 5},
                 'access_control': {'enabled': True, 'admins': [], 'whitelist': []},
                 'tts': {'enabled': False, 'api_key': '', 'api_url': 'https://api.qhaigc.net', 
-                       'model': 'qhai-tts:永雏塔菲', 'max_text_length': 300}
+                       'model': 'qhai-tts:永雏塔菲', 'max_text_length': 300, 'response_format': 'pcm',
+                       'voice_deadline': 30, 'stt_enabled': False, 'stt_model': 'qhai-stt:general',
+                       'post_process': {'enabled': True, 'silence_db': -45, 'target_dbfs': -18, 'peak_dbfs': -1,
+                                        'padding_ms': 80},
+                       'endpoints': [],
+                       'routing': {'alpha': 0.2, 'error_penalty_ms': 3000, 'max_failures': 3, 'cooldown': 30,
+                                   'probe_interval': 60, 'timeout': 30, 'hedge': True, 'hedge_after_ms': 1500,
+                                   'hedge_rate': 0.1, 'hedge_burst': 3, 'concurrency': 8}},
+                'stt': {'language': 'zh', 'max_chunk_seconds': 15, 'concurrency': 4, 'timeout': 30, 'vad': True},
+                'codec': {'backend': 'auto', 'ffmpeg_path': '', 'encoder_path': '', 'decoder_path': ''},
+                'interaction': {'click_through': True, 'alpha_threshold': 16},
+                'animation': {'fps': 30, 'transition_ms': 200, 'pixmap_cache_size': 24},
+                'idle': {'enabled': True, 'threshold': 300, 'min_interval': 1, 'max_interval': 30,
+                         'idle_max_interval': 5, 'queue_interval_ms': 100, 'dormant_queue_interval_ms': 1000,
+                         'remind_unread': True},
+                'message_log': {'enabled': True, 'path': 'data/messages.db', 'batch_size': 256, 'flush_interval': 0.2},
+                'profiler': {'command': 'wife_profile', 'default_duration': 10, 'max_duration': 60,
+                             'interval': 0.005, 'top': 8},
+                'playback': {'buffer_ms': 100, 'cache_clips': 16, 'max_pcm_seconds': 60},
+                'memory': {'enabled': True, 'path': 'data/memory.db', 'top_k': 3, 'token_budget': 300,
+                           'time_budget_ms': 20, 'max_postings': 20000}
             }
     
-    def check_user_permission(self, user_id):
+    def get_tts(self):
+        if self.tts is None and self.config.get('tts', {}).get('enabled', False):
+            from .tts import QhaiTTS
+            self.tts = QhaiTTS(self.config.get('tts', {}))
+        return self.tts
+    
+    def get_stt(self):
+        tts_config = self.config.get('tts', {})
+        if self.stt is None and tts_config.get('stt_enabled', False):
+            from .stt import QhaiSTT
+            stt_config = dict(self.config.get('stt', {}))
+            stt_config.setdefault('api_key', tts_config.get('api_key', ''))
+            stt_config.setdefault('api_url', tts_config.get('api_url', 'https://api.qhaigc.net'))
+            stt_config.setdefault('model', tts_config.get('stt_model', 'qhai-stt:general'))
+            stt_config.setdefault('cache_dir', self.audio_cache_dir)
+            self.stt = QhaiSTT(stt_config, self.get_codec())
+        return self.stt
+    
+    def get_codec(self):
+        if self.codec is None:
+            from .codec import create_backend
+            self.codec = create_backend(self.config.get('codec', {}), self.plugin_dir)
+        return self.codec
+    
+    def check_user_permission(self, user_id, admin_only=False):
         user_id = str(user_id)
+        admins = [str(admin_id) for admin_id in self.config.get('access_control', {}).get('admins', [])]
+        
+        if admin_only:
+            return user_id in admins
         
         if not self.config.get('access_control', {}).get('enabled', True):
             return True
         
-        admins = [str(admin_id) for admin_id in self.config.get('access_control', {}).get('admins', [])]
         whitelist = [str(user_id) for user_id in self.config.get('access_control', {}).get('whitelist', [])]
         
         if user_id in admins or user_id in whitelist:
@@ -88,15 +143,18 @@ class WifeImagePlugin(BasePlugin):
         
         for file in os.listdir(self.image_dir):
             name, ext = os.path.splitext(file)
-            if ext.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
+            if ext.lower() in IMAGE_EXTENSIONS:
                 valid_emotions[name] = file
                 emotion_list.append(name)
         
         self.emotions = valid_emotions
         
+        manifest = load_manifest(self.image_dir)
+        compiled = {name: entry for name, entry in manifest.items() if valid_emotions.get(name) == entry['source']}
+        
         try:
             with open(self.emotions_json_path, 'w', encoding='utf-8') as f:
-                json.dump({"emotions": emotion_list}, f, ensure_ascii=False, indent=4)
+                json.dump({"emotions": emotion_list, "compiled": compiled}, f, ensure_ascii=False, indent=4)
         except Exception:
             pass
     
@@ -109,22 +167,116 @@ class WifeImagePlugin(BasePlugin):
     
     async def initialize(self):
         try:
-            self.msg_queue = multiprocessing.Queue()
+            self.startup.mark('initialize')
+            self.scan_emotions()
             
             if self.config['process']['use_separate_process']:
                 try:
-                    from plugins.Wife_image.ui import start_ui
-                    self.ui_process = multiprocessing.Process(
-                        target=start_ui,
-                        args=(self.config_path, self.msg_queue)
+                    from .supervisor import UISupervisor
+                    self.supervisor = UISupervisor(self.config_path, self.config, self.startup)
+                    self.supervisor.add_listener(self.on_ui_status)
+                    self.supervisor.start()
+                    self.startup.mark('ui_spawned')
+                except Exception:
+                    pass
+            
+            self.cleanup_thread = threading.Thread(target=self.cleanup_audio_files, daemon=True)
+            self.cleanup_thread.start()
+            
+            log_config = self.config.get('message_log', {})
+            if log_config.get('enabled', True):
+                try:
+                    from .message_store import MessageStore
+                    self.message_store = MessageStore(
+                        os.path.join(self.plugin_dir, log_config.get('path', 'data/messages.db')),
+                        log_config.get('batch_size', 256),
+                        log_config.get('flush_interval', 0.2)
                     )
-                    self.ui_process.daemon = True
-                    self.ui_process.start()
+                except Exception:
+                    pass
+            
+            memory_config = self.config.get('memory', {})
+            if memory_config.get('enabled', True):
+                try:
+                    from .memory import MemoryStore
+                    self.memory = MemoryStore(
+                        os.path.join(self.plugin_dir, memory_config.get('path', 'data/memory.db')),
+                        memory_config.get('top_k', 3),
+                        memory_config.get('token_budget', 300),
+                        memory_config.get('time_budget_ms', 20),
+                        memory_config.get('max_postings', 20000)
+                    )
+                    self.memory.start()
                 except Exception:
                     pass
         except Exception:
             pass
     
+    def get_ui_stats(self):
+        if self.supervisor:
+            return self.supervisor.stats()
+        return None
+    
+    def get_dispatch_stats(self):
+        return self.dispatcher.stats()
+    
+    def get_tts_stats(self):
+        if self.tts:
+            return self.tts.stats()
+        return None
+    
+    def get_stt_stats(self):
+        if self.stt:
+            return self.stt.stats()
+        return None
+    
+    def get_codec_stats(self):
+        if self.codec:
+            return self.codec.stats()
+        return None
+    
+    def get_memory_stats(self):
+        if self.memory:
+            return self.memory.stats()
+        return None
+    
+    async def get_unread_since(self, since, launcher_id=None, limit=100):
+        if not self.message_store:
+            return []
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.message_store.flush)
+        return await loop.run_in_executor(None, self.message_store.unread_since, since, launcher_id, limit)
+    
+    def on_ui_status(self, msg):
+        if msg.get('type') == 'profile':
+            if self.profile_waiter:
+                loop, future = self.profile_waiter
+                content = msg.get('content')
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(content))
+            return
+        if msg.get('type') == 'touch':
+            if self.message_store:
+                self.message_store.mark_read()
+            return
+        if msg.get('type') != 'activity':
+            return
+        activity = msg.get('content') or {}
+        if activity.get('idle') or not activity.get('since'):
+            return
+        if not self.message_store or not self.config.get('idle', {}).get('remind_unread', True):
+            return
+        threading.Thread(target=self.remind_unread, args=(activity['since'],), daemon=True).start()
+    
+    def remind_unread(self, since):
+        try:
+            self.message_store.flush()
+            unread = self.message_store.count_unread_since(since)
+            total = sum(unread.values())
+            if total:
+                self.send_to_ui('message', f"你不在的时候，{len(unread)}个会话里有{total}条新消息哦~")
+        except Exception:
+            pass
+    
     def process_emotion(self, text):
         modified_text = text
         found_emotion = None
@@ -141,90 +293,50 @@ class WifeImagePlugin(BasePlugin):
         return re.sub(self.emotion_pattern, '', text).strip()
     
     def send_to_ui(self, msg_type, content):
-        if self.msg_queue:
-            try:
-                self.msg_queue.put({
-                    'type': msg_type,
-                    'content': content,
-                    'timestamp': time.time()
-                })
-            except Exception:
-                pass
+        if self.supervisor:
+            self.supervisor.put({
+                'type': msg_type,
+                'content': content,
+                'timestamp': time.time()
+            })
     
     def play_audio(self, audio_path):
-        if self.msg_queue and audio_path and os.path.exists(audio_path):
-            try:
-                self.msg_queue.put({
-                    'type': 'audio',
-                    'content': audio_path,
-                    'timestamp': time.time()
-                })
-            except Exception:
-                pass
+        if audio_path and os.path.exists(audio_path):
+            self.send_to_ui('audio', audio_path)
     
-    def convert_to_silk(self, mp3_file):
+    def convert_to_silk(self, audio_file, pcm=None, sample_rate=PCM_SAMPLE_RATE):
         try:
-            silk_file_path = f"{mp3_file}.silk"
-            pcm_file_path = f"{mp3_file}.pcm"
+            silk_file_path = f"{audio_file}.silk"
             
-            if not os.path.exists(self.ffmpeg_path):
-                return None
+            if os.path.exists(silk_file_path) and os.path.getsize(silk_file_path) > 0:
+                return silk_file_path
                 
-            if not os.path.exists(mp3_file):
+            if not os.path.exists(audio_file):
                 return None
-                
-            result = subprocess.run(
-                [
-                    self.ffmpeg_path,
-                    '-y',
-                    '-i', mp3_file,
-                    '-f', 's16le',
-                    '-ar', '24000',
-                    '-ac', '1',
-                    pcm_file_path
-                ],
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                text=False,
-                check=False
-            )
             
-            if result.returncode != 0 or not os.path.exists(pcm_file_path):
-                return None
-
-            if os.path.exists(self.encoder_path):
-                result = subprocess.run(
-                    [
-                        self.encoder_path,
-                        pcm_file_path,
-                        silk_file_path,
-                        "-rate", "24000",
-                        "-tencent",
-                        "-quiet"
-                    ],
-                    stderr=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    text=False,
-                    check=False
-                )
-                
-                if os.path.exists(pcm_file_path):
-                    os.remove(pcm_file_path)
-                    
-                if result.returncode == 0 and os.path.exists(silk_file_path) and os.path.getsize(silk_file_path) > 0:
-                    return silk_file_path
-                else:
-                    return None
-            else:
-                if os.path.exists(pcm_file_path):
-                    os.remove(pcm_file_path)
+            if pcm is None and audio_file.endswith('.wav'):
+                pcm, sample_rate = read_wav(audio_file)
+            
+            if not pcm:
+                sample_rate = PCM_SAMPLE_RATE
+                pcm = self.get_codec().decode(audio_file, sample_rate)
+            
+            if not pcm:
                 return None
+            
+            if self.get_codec().encode_silk(pcm, sample_rate, silk_file_path):
+                return silk_file_path
+            return None
                 
         except Exception as e:
             return None
     
     @handler(PromptPreProcessing)
     async def handle_prompt_preprocessing(self, ctx: EventContext):
+        key = conversation_key(ctx.event)
+        if key:
+            self.prompt_started[key] = time.time()
+        
         emotion_list = ", ".join(self.emotions.keys())
         emotion_prompt = f"你现在有一个**虚拟形象**可以在对话中使用命令来表达情感或心情控制虚拟形象每次只能使用一个表情，格式为[:表情名]。**当前支持的表情**: {emotion_list}。表情标记会在回复中显示对应的表情，但不会在消息文本中显示。不使用表情时需要默认带上[:默认]，多使用不同的表情。"
         
@@ -234,21 +346,229 @@ class WifeImagePlugin(BasePlugin):
                 last_user_index = i
         
         if last_user_index != -1:
-            ctx.event.default_prompt.insert(last_user_index + 1, llm_entities.Message(
-                role='system',
-                content=emotion_prompt
-            ))
+            insert_index = last_user_index + 1
         else:
-            ctx.event.default_prompt.append(llm_entities.Message(
-                role='system',
-                content=emotion_prompt
-            ))
+            insert_index = len(ctx.event.default_prompt)
+        ctx.event.default_prompt.insert(insert_index, llm_entities.Message(
+            role='system',
+            content=emotion_prompt
+        ))
+        
+        if self.memory:
+            user = sender_key(ctx.event)
+            text = query_text(ctx.event)
+            if user and text:
+                self.pending_turns[(key, user)] = text
+                try:
+                    loop = asyncio.get_running_loop()
+                    memory_prompt = await loop.run_in_executor(None, self.memory.build_prompt, user, text)
+                except Exception:
+                    memory_prompt = None
+                if memory_prompt:
+                    ctx.event.default_prompt.insert(insert_index + 1, llm_entities.Message(
+                        role='system',
+                        content=memory_prompt
+                    ))
+    
+    if STREAM_EVENT is not None:
+        @handler(STREAM_EVENT)
+        async def handle_response_chunk(self, ctx: EventContext):
+            if not self.check_user_permission(ctx.event.sender_id):
+                return
+            
+            key = conversation_key(ctx.event)
+            if not key:
+                return
+            
+            state = self.streams.get(key)
+            if state is None:
+                state = StreamState(self.prompt_started.pop(key, None))
+                self.streams[key] = state
+            
+            chunk = None
+            for attr in ('chunk', 'chunk_text', 'delta'):
+                chunk = getattr(ctx.event, attr, None)
+                if isinstance(chunk, str):
+                    break
+            if not isinstance(chunk, str):
+                response_text = getattr(ctx.event, 'response_text', '') or ''
+                chunk = response_text[len(state.raw):] if response_text.startswith(state.raw) else ''
+            
+            self.feed_stream(state, chunk)
+    
+    def feed_stream(self, state, chunk):
+        state.raw += chunk
+        text, emotions = state.parser.feed(chunk)
+        
+        for emotion in emotions:
+            if emotion in self.emotions:
+                state.emotion = emotion
+                self.send_to_ui('emotion', emotion)
+        
+        if text:
+            if state.first_chunk is None:
+                state.first_chunk = time.time()
+            self.send_to_ui('message_chunk', {
+                'text': text,
+                'reset': state.chunks == 0,
+                'started': state.started,
+                'first_chunk': state.first_chunk
+            })
+            state.chunks += 1
+    
+    def log_message(self, event, direction, content, read=False):
+        if self.message_store:
+            self.message_store.record(
+                event.launcher_type,
+                event.launcher_id,
+                event.sender_id,
+                direction,
+                content,
+                read=read
+            )
+    
+    async def transcribe_voice(self, ctx):
+        chain = getattr(ctx.event, 'message_chain', None)
+        if not chain or not self.check_user_permission(ctx.event.sender_id) or not self.get_stt():
+            return None
+        
+        voices = [component for component in chain if isinstance(component, platform_message.Voice)]
+        if not voices:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        texts = []
+        for voice in voices:
+            try:
+                result = await loop.run_in_executor(None, self.transcribe_component, voice)
+                if result and result.text:
+                    texts.append(result.text)
+            except Exception:
+                pass
+        
+        if not texts:
+            return None
+        
+        transcript = ''.join(texts)
+        ctx.event.alter = f"{ctx.event.text_message or ''}{transcript}"
+        return ctx.event.alter
+    
+    def transcribe_component(self, component):
+        from .stt import load_voice
+        return self.get_stt().transcribe_bytes(load_voice(component))
+    
+    @handler(PersonCommandSent)
+    async def handle_person_command(self, ctx: EventContext):
+        await self.handle_command(ctx)
+    
+    @handler(GroupCommandSent)
+    async def handle_group_command(self, ctx: EventContext):
+        await self.handle_command(ctx)
+    
+    async def handle_command(self, ctx):
+        profiler = self.config.get('profiler', {})
+        if ctx.event.command != profiler.get('command', 'wife_profile'):
+            return
+        
+        ctx.prevent_default()
+        if not self.check_user_permission(ctx.event.sender_id, admin_only=True):
+            ctx.add_return('reply', ["只有管理员可以使用性能采样"])
+            return
+        
+        if 'startup' in (ctx.event.params or []):
+            startup = self.supervisor.startup if self.supervisor else self.startup
+            ctx.add_return('reply', [startup.format_report()])
+            return
+        
+        target = 'all'
+        duration = profiler.get('default_duration', 10)
+        for param in ctx.event.params or []:
+            if param in ('plugin', 'ui', 'all'):
+                target = param
+            else:
+                try:
+                    duration = float(param)
+                except ValueError:
+                    pass
+        duration = min(max(duration, 1), profiler.get('max_duration', 60))
+        
+        if self.profiling:
+            ctx.add_return('reply', ["已有采样正在进行，请稍后再试"])
+            return
+        ctx.add_return('reply', [await self.run_profile(target, duration)])
+    
+    async def run_profile(self, target, duration):
+        from .sampler import profile, format_report
+        
+        profiler = self.config.get('profiler', {})
+        interval = profiler.get('interval', 0.005)
+        limit = profiler.get('top', 8)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        temp_dir = os.path.join(self.plugin_dir, 'temp')
+        loop = asyncio.get_running_loop()
+        reports = []
+        
+        self.profiling = True
+        try:
+            ui_future = None
+            if target in ('ui', 'all') and self.supervisor:
+                ui_future = loop.create_future()
+                self.profile_waiter = (loop, ui_future)
+                self.supervisor.put({
+                    'type': 'profile',
+                    'content': {
+                        'path': os.path.join(temp_dir, f"profile_ui_{stamp}.collapsed"),
+                        'duration': duration,
+                        'interval': interval,
+                        'limit': limit
+                    },
+                    'timestamp': time.time()
+                })
+            
+            if target in ('plugin', 'all'):
+                result = await loop.run_in_executor(
+                    None, profile, os.path.join(temp_dir, f"profile_plugin_{stamp}.collapsed"), duration, interval, limit
+                )
+                reports.append(format_report("插件进程", result))
+            
+            if ui_future is not None:
+                timeout = duration + self.config.get('process', {}).get('heartbeat_interval', 2) * 2 + 10
+                try:
+                    result = await asyncio.wait_for(ui_future, timeout)
+                except asyncio.TimeoutError:
+                    result = None
+                reports.append(format_report("界面进程", result))
+        finally:
+            self.profiling = False
+            self.profile_waiter = None
+        
+        return "\n\n".join(reports) or "界面进程未运行"
+    
+    @handler(PersonNormalMessageReceived)
+    async def handle_person_message(self, ctx: EventContext):
+        text = await self.transcribe_voice(ctx)
+        self.log_message(ctx.event, 'in', text or ctx.event.text_message)
+    
+    @handler(GroupNormalMessageReceived)
+    async def handle_group_message(self, ctx: EventContext):
+        text = await self.transcribe_voice(ctx)
+        self.log_message(ctx.event, 'in', text or ctx.event.text_message)
     
     @handler(NormalMessageResponded)
     async def handle_model_response(self, ctx: EventContext):
         response_text = ctx.event.response_text
         sender_id = ctx.event.sender_id
         
+        self.log_message(ctx.event, 'out', self.remove_all_emotions(response_text), read=True)
+        if self.message_store:
+            self.message_store.mark_read(ctx.event.launcher_id)
+        
+        key = conversation_key(ctx.event)
+        state = self.streams.pop(key, None) if key else None
+        if key:
+            self.prompt_started.pop(key, None)
+        self.remember_turn(ctx.event, key, response_text)
+        
         has_emotion = bool(re.search(self.emotion_pattern, response_text))
         
         if has_emotion:
@@ -256,50 +576,47 @@ class WifeImagePlugin(BasePlugin):
             
             if self.check_user_permission(sender_id):
                 if emotion:
-                    audio_path = None
-                    silk_path = None
-                    if self.tts and self.config.get('tts', {}).get('enabled', False):
-                        audio_path = self.tts.text_to_speech(modified_text)
-                        if audio_path:
-                            silk_path = self.convert_to_silk(audio_path)
-                    
-                    self.send_to_ui('emotion', emotion)
+                    if not state or state.emotion != emotion:
+                        self.send_to_ui('emotion', emotion)
                     self.send_to_ui('message', modified_text)
                     
-                    if audio_path:
-                        self.play_audio(audio_path)
+                    voice_job = None
+                    if self.get_tts():
+                        voice_job = lambda deadline: self.synthesize_voice(modified_text, deadline)
                     
-                    if silk_path and os.path.exists(silk_path):
-                        ctx.prevent_default()
-                        
-                        await ctx.send_message(
-                            ctx.event.launcher_type,
-                            ctx.event.launcher_id,
-                            [platform_message.Plain(modified_text)]
-                        )
-                        
-                        await ctx.send_message(
-                            ctx.event.launcher_type,
-                            ctx.event.launcher_id,
-                            [platform_message.Voice(path=silk_path)]
-                        )
-                        return
-                    elif modified_text != response_text:
-                        ctx.prevent_default()
-                        await ctx.send_message(
-                            ctx.event.launcher_type,
-                            ctx.event.launcher_id,
-                            [platform_message.Plain(modified_text)]
-                        )
-                        return
+                    ctx.prevent_default()
+                    await self.dispatcher.dispatch(ctx, modified_text, voice_job)
+                    return
             
             if modified_text != response_text:
                 ctx.prevent_default()
-                await ctx.send_message(
-                    ctx.event.launcher_type,
-                    ctx.event.launcher_id,
-                    [platform_message.Plain(modified_text)]
-                )
+                await self.dispatcher.dispatch(ctx, modified_text)
+    
+    def remember_turn(self, event, key, response_text):
+        user = sender_key(event)
+        user_text = self.pending_turns.pop((key, user), None) or query_text(event)
+        if not self.memory or not user or not user_text:
+            return
+        try:
+            asyncio.get_running_loop().run_in_executor(
+                None, self.memory.add, user, user_text, self.remove_all_emotions(response_text)
+            )
+        except Exception:
+            pass
+    
+    def synthesize_voice(self, text, deadline=None):
+        tts_result = self.get_tts().synthesize(text)
+        if not tts_result:
+            return None
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        
+        self.play_audio(tts_result.path)
+        
+        silk_path = self.convert_to_silk(tts_result.path, tts_result.pcm, tts_result.sample_rate)
+        if silk_path and os.path.exists(silk_path):
+            return silk_path
+        return None
     
     def cleanup_audio_files(self):
         while True:
@@ -331,16 +648,35 @@ class WifeImagePlugin(BasePlugin):
     
     def __del__(self):
         try:
-            if self.msg_queue:
+            if self.supervisor:
                 try:
-                    self.msg_queue.put({'type': 'exit', 'content': None})
+                    self.supervisor.stop()
+                except:
+                    pass
+            
+            if self.message_store:
+                try:
+                    self.message_store.close()
+                except:
+                    pass
+            
+            if self.stt:
+                try:
+                    self.stt.close()
+                except:
+                    pass
+            
+            if self.tts:
+                try:
+                    self.tts.close()
+                except:
+                    pass
+            
+            if self.memory:
+                try:
+                    self.memory.close()
                 except:
                     pass
-                    
-            if self.ui_process and self.ui_process.is_alive():
-                time.sleep(0.5)
-                self.ui_process.terminate()
-                self.ui_process.join(3)
                 
             try:
                 for filename in os.listdir(self.audio_cache_dir):
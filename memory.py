@@ -0,0 +1,276 @@
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+
+TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fa5]+|[a-zA-Z0-9]+')
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fa5]')
+BLOCK = 512
+RANK_COST = 2e-7
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS turns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_key TEXT NOT NULL,
+        user_text TEXT NOT NULL,
+        reply_text TEXT NOT NULL,
+        timestamp REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_turns_user ON turns (user_key, id)",
+]
+
+
+def tokenize(text):
+    terms = []
+    for word in TOKEN_PATTERN.findall((text or '').lower()):
+        if CJK_PATTERN.match(word):
+            if len(word) == 1:
+                terms.append(word)
+            else:
+                terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            terms.append(word)
+    return terms
+
+
+def estimate_tokens(text):
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class UserIndex:
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.row_ids = array('q')
+        self.lengths = array('H')
+        self.total_length = 0
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def add(self, row_id, text):
+        terms = tokenize(text)
+        doc = len(self.row_ids)
+        self.row_ids.append(row_id)
+        self.lengths.append(min(len(terms), 65535))
+        self.total_length += len(terms)
+
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array('I'), array('H'))
+            entry[0].append(doc)
+            entry[1].append(min(count, 65535))
+
+    def search(self, query, k=3, max_postings=20000, deadline=None):
+        docs = len(self.row_ids)
+        if not docs:
+            return []
+
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        terms.sort(key=lambda term: len(self.postings[term][0]))
+        avg_length = self.total_length / docs or 1.0
+
+        k1 = self.k1
+        base = k1 * (1 - self.b)
+        scale = k1 * self.b / avg_length
+        lengths = self.lengths
+        scores = {}
+        get = scores.get
+        step = 0.0
+        for term in terms:
+            ids, tfs = self.postings[term]
+            df = len(ids)
+            idf = math.log(1 + (docs - df + 0.5) / (df + 0.5))
+            weight = idf * (k1 + 1)
+            stop = max(0, df - max_postings)
+            for end in range(df, stop, -BLOCK):
+                if deadline is not None:
+                    now = time.perf_counter()
+                    if now + step + len(scores) * RANK_COST > deadline:
+                        return self.top(scores, k)
+                begin = max(stop, end - BLOCK)
+                if len(scores) < max_postings:
+                    for doc, tf in zip(ids[begin:end], tfs[begin:end]):
+                        scores[doc] = get(doc, 0.0) + weight * tf / (tf + base + scale * lengths[doc])
+                else:
+                    for doc, tf in zip(ids[begin:end], tfs[begin:end]):
+                        if doc in scores:
+                            scores[doc] += weight * tf / (tf + base + scale * lengths[doc])
+                if deadline is not None:
+                    step = time.perf_counter() - now
+
+        return self.top(scores, k)
+
+    def top(self, scores, k):
+        best = heapq.nlargest(k, scores, key=scores.get)
+        return [(scores[doc], self.row_ids[doc]) for doc in best]
+
+
+class MemoryStore:
+
+    def __init__(self, db_path, top_k=3, token_budget=300, time_budget_ms=20, max_postings=20000):
+        self.db_path = db_path
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.time_budget = time_budget_ms / 1000.0
+        self.max_postings = max_postings
+        self.lock = threading.Lock()
+        self.indexes = {}
+        self.ready = False
+        self.closed = False
+        self.load_time = None
+        self.searches = 0
+        self.search_time = 0.0
+        self.max_search_time = 0.0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+
+    def start(self):
+        threading.Thread(target=self.load_all, daemon=True).start()
+
+    def load_all(self):
+        start = time.perf_counter()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            users = [row[0] for row in conn.execute("SELECT DISTINCT user_key FROM turns")]
+            for user_key in users:
+                if self.closed:
+                    return
+                index = UserIndex()
+                last = 0
+                rows = conn.execute(
+                    "SELECT id, user_text, reply_text FROM turns WHERE user_key = ? ORDER BY id",
+                    (user_key,)
+                )
+                for row_id, user_text, reply_text in rows:
+                    index.add(row_id, f"{user_text} {reply_text}")
+                    last = row_id
+                with self.lock:
+                    self.catch_up(user_key, index, last)
+        except Exception:
+            pass
+        finally:
+            conn.close()
+
+        with self.lock:
+            if self.closed:
+                return
+            for (user_key,) in self.conn.execute("SELECT DISTINCT user_key FROM turns").fetchall():
+                if user_key not in self.indexes:
+                    self.catch_up(user_key, UserIndex(), 0)
+            self.ready = True
+            self.load_time = time.perf_counter() - start
+
+    def catch_up(self, user_key, index, last):
+        rows = self.conn.execute(
+            "SELECT id, user_text, reply_text FROM turns WHERE user_key = ? AND id > ? ORDER BY id",
+            (user_key, last)
+        )
+        for row_id, user_text, reply_text in rows:
+            index.add(row_id, f"{user_text} {reply_text}")
+        self.indexes[user_key] = index
+
+    def index_for(self, user_key):
+        index = self.indexes.get(user_key)
+        if index is None and self.ready:
+            index = self.indexes[user_key] = UserIndex()
+        return index
+
+    def add(self, user_key, user_text, reply_text, timestamp=None):
+        if not user_key or not (user_text or reply_text):
+            return None
+        user_key = str(user_key)
+        with self.lock:
+            index = self.index_for(user_key)
+            cursor = self.conn.execute(
+                "INSERT INTO turns (user_key, user_text, reply_text, timestamp) VALUES (?, ?, ?, ?)",
+                (user_key, user_text or '', reply_text or '', timestamp or time.time())
+            )
+            self.conn.commit()
+            if index is not None:
+                index.add(cursor.lastrowid, f"{user_text} {reply_text}")
+            return cursor.lastrowid
+
+    def search(self, user_key, query, k=None):
+        if not user_key or not query:
+            return []
+        start = time.perf_counter()
+        with self.lock:
+            index = self.index_for(str(user_key))
+            if index is None:
+                return []
+            hits = index.search(query, k or self.top_k, self.max_postings, time.perf_counter() + self.time_budget)
+            elapsed = time.perf_counter() - start
+            self.searches += 1
+            self.search_time += elapsed
+            self.max_search_time = max(self.max_search_time, elapsed)
+            if not hits:
+                return []
+
+            row_ids = [row_id for _, row_id in hits]
+            placeholders = ','.join('?' * len(row_ids))
+            rows = {
+                row[0]: row for row in self.conn.execute(
+                    f"SELECT id, user_text, reply_text, timestamp FROM turns WHERE id IN ({placeholders})",
+                    row_ids
+                )
+            }
+        return [rows[row_id] + (score,) for score, row_id in hits if row_id in rows]
+
+    def build_prompt(self, user_key, query):
+        hits = self.search(user_key, query)
+        if not hits:
+            return None
+
+        header = "以下是你和对方过去的相关对话，可以在合适的时候自然地提起："
+        lines = []
+        used = estimate_tokens(header)
+        for _, user_text, reply_text, timestamp, _ in hits:
+            day = time.strftime('%Y-%m-%d', time.localtime(timestamp))
+            line = f"[{day}] 对方：{user_text} / 你：{reply_text}"
+            cost = estimate_tokens(line)
+            if used + cost > self.token_budget:
+                break
+            lines.append(line)
+            used += cost
+        if not lines:
+            return None
+        return "\n".join([header] + lines)
+
+    def stats(self):
+        return {
+            'ready': self.ready,
+            'load_ms': self.load_time * 1000 if self.load_time is not None else None,
+            'users': len(self.indexes),
+            'turns': sum(len(index) for index in self.indexes.values()),
+            'searches': self.searches,
+            'avg_search_ms': self.search_time / self.searches * 1000 if self.searches else None,
+            'max_search_ms': self.max_search_time * 1000,
+        }
+
+    def close(self):
+        self.closed = True
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,150 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from itertools import groupby
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        launcher_type TEXT NOT NULL,
+        launcher_id TEXT NOT NULL,
+        sender_id TEXT,
+        direction TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        read INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_messages_launcher ON messages (launcher_id, timestamp, read)",
+    "CREATE INDEX IF NOT EXISTS idx_messages_unread ON messages (read, timestamp)",
+]
+
+INSERT_SQL = (
+    "INSERT INTO messages (launcher_type, launcher_id, sender_id, direction, content, timestamp, read) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+MARK_ALL_SQL = "UPDATE messages SET read = 1 WHERE read = 0 AND timestamp <= ?"
+MARK_SQL = "UPDATE messages SET read = 1 WHERE launcher_id = ? AND read = 0 AND timestamp <= ?"
+
+
+class MessageStore:
+
+    def __init__(self, db_path, batch_size=256, flush_interval=0.2):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.read_lock = threading.Lock()
+        self.running = True
+        self.written = 0
+        self.batches = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.reader = self.connect()
+        for statement in SCHEMA:
+            self.reader.execute(statement)
+        self.reader.commit()
+
+        self.writer_thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer_thread.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, launcher_type, launcher_id, sender_id, direction, content, timestamp=None, read=False):
+        if not self.running or not content:
+            return
+        self.queue.put((INSERT_SQL, (
+            str(launcher_type),
+            str(launcher_id),
+            str(sender_id) if sender_id is not None else None,
+            direction,
+            content,
+            timestamp or time.time(),
+            1 if read else 0
+        )))
+
+    def write_loop(self):
+        conn = self.connect()
+        while self.running or not self.queue.empty():
+            batch = []
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if not batch:
+                continue
+
+            try:
+                with conn:
+                    for sql, group in groupby(batch, key=lambda item: item[0]):
+                        conn.executemany(sql, [params for _, params in group])
+                self.written += sum(1 for sql, _ in batch if sql is INSERT_SQL)
+                self.batches += 1
+            except Exception:
+                pass
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        conn.close()
+
+    def flush(self):
+        self.queue.join()
+
+    def query(self, sql, params=()):
+        with self.read_lock:
+            return self.reader.execute(sql, params).fetchall()
+
+    def unread_since(self, since, launcher_id=None, limit=100):
+        if launcher_id is None:
+            return self.query(
+                "SELECT launcher_type, launcher_id, sender_id, content, timestamp FROM messages "
+                "WHERE read = 0 AND timestamp >= ? ORDER BY timestamp LIMIT ?",
+                (since, limit)
+            )
+        return self.query(
+            "SELECT launcher_type, launcher_id, sender_id, content, timestamp FROM messages "
+            "WHERE launcher_id = ? AND timestamp >= ? AND read = 0 ORDER BY timestamp LIMIT ?",
+            (str(launcher_id), since, limit)
+        )
+
+    def count_unread_since(self, since):
+        rows = self.query(
+            "SELECT launcher_id, COUNT(*) FROM messages WHERE read = 0 AND timestamp >= ? GROUP BY launcher_id",
+            (since,)
+        )
+        return dict(rows)
+
+    def mark_read(self, launcher_id=None, before=None):
+        if not self.running:
+            return
+        before = before or time.time()
+        if launcher_id is None:
+            self.queue.put((MARK_ALL_SQL, (before,)))
+        else:
+            self.queue.put((MARK_SQL, (str(launcher_id), before)))
+
+    def stats(self):
+        return {
+            'pending': self.queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+        }
+
+    def close(self):
+        self.running = False
+        self.writer_thread.join(5)
+        with self.read_lock:
+            self.reader.close()
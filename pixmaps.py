@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QBitmap, QImage, QPainter, QPixmap, QRegion
+
+DEFAULT_REGIONS = [
+    {'name': 'head', 'rect': [0.2, 0.0, 0.6, 0.3]},
+    {'name': 'body', 'rect': [0.15, 0.3, 0.7, 0.45]},
+    {'name': 'feet', 'rect': [0.15, 0.75, 0.7, 0.25]},
+]
+
+OPAQUE = 255
+
+
+class PixmapEntry:
+    __slots__ = ('pixmap', 'mask', 'region', 'hitmap', 'stride', 'regions')
+
+    def __init__(self, pixmap, mask, hitmap, stride, regions):
+        self.pixmap = pixmap
+        self.mask = mask
+        self.region = QRegion(mask) if mask is not None else None
+        self.hitmap = hitmap
+        self.stride = stride
+        self.regions = regions
+
+    def hit_test(self, x, y):
+        if self.hitmap is None:
+            if 0 <= x < self.pixmap.width() and 0 <= y < self.pixmap.height():
+                return OPAQUE
+            return 0
+        if x < 0 or y < 0 or x >= self.pixmap.width() or y >= self.pixmap.height():
+            return 0
+        return self.hitmap[y * self.stride + x]
+
+    def region_at(self, x, y):
+        index = self.hit_test(x, y)
+        if 0 < index <= len(self.regions):
+            return self.regions[index - 1]
+        return None
+
+
+def build_entry(source, width, height, regions=None, threshold=16, transform=Qt.SmoothTransformation):
+    pixmap = source.scaled(width, height, Qt.KeepAspectRatio, transform)
+    regions = regions if regions is not None else DEFAULT_REGIONS
+
+    if not pixmap.hasAlphaChannel():
+        return PixmapEntry(pixmap, None, None, 0, regions)
+
+    alpha = pixmap.toImage().convertToFormat(QImage.Format_Alpha8)
+    stride = alpha.bytesPerLine()
+    bits = alpha.constBits()
+    bits.setsize(alpha.byteCount())
+
+    opaque_table = bytes(0 if value < threshold else OPAQUE for value in range(256))
+    opaque = bytes(bits).translate(opaque_table)
+    hitmap = bytearray(opaque)
+
+    for index, region in enumerate(regions[:OPAQUE - 1], start=1):
+        rect = scale_rect(region['rect'], pixmap.width(), pixmap.height())
+        label_table = bytes(index if value == OPAQUE else value for value in range(256))
+        for row in range(rect.top(), rect.bottom() + 1):
+            start = row * stride + rect.left()
+            end = start + rect.width()
+            hitmap[start:end] = hitmap[start:end].translate(label_table)
+
+    mask_image = QImage(opaque, pixmap.width(), pixmap.height(), stride, QImage.Format_Alpha8).copy()
+    mask = QBitmap.fromImage(mask_image.createAlphaMask(Qt.ThresholdAlphaDither))
+    return PixmapEntry(pixmap, mask, hitmap, stride, regions)
+
+
+def scale_rect(fractions, width, height):
+    x, y, w, h = fractions
+    rect = QRect(int(x * width), int(y * height), max(1, int(w * width)), max(1, int(h * height)))
+    return rect.intersected(QRect(0, 0, width, height))
+
+
+def blend_frame(from_pixmap, to_pixmap, progress):
+    width = max(from_pixmap.width(), to_pixmap.width())
+    height = max(from_pixmap.height(), to_pixmap.height())
+    frame = QPixmap(width, height)
+    frame.fill(Qt.transparent)
+
+    painter = QPainter(frame)
+    painter.setOpacity(1.0 - progress)
+    painter.drawPixmap((width - from_pixmap.width()) // 2, (height - from_pixmap.height()) // 2, from_pixmap)
+    painter.setOpacity(progress)
+    painter.drawPixmap((width - to_pixmap.width()) // 2, (height - to_pixmap.height()) // 2, to_pixmap)
+    painter.end()
+    return frame
+
+
+def mask_region(entry, offset_x, offset_y):
+    if entry.region is None or entry.region.isEmpty():
+        return None
+    return entry.region.translated(offset_x, offset_y)
+
+
+class PixmapCache:
+
+    def __init__(self, capacity=24):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.keys = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        self.keys.add(key)
+        entry = factory()
+        self.entries[key] = entry
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'capacity': self.capacity,
+            'distinct_keys': len(self.keys),
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
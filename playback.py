@@ -0,0 +1,287 @@
+import os
+import time
+from collections import OrderedDict, deque
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from .audio import read_wav, pcm_duration, PCM_SAMPLE_WIDTH, PCM_CHANNELS
+
+
+class Clip:
+    __slots__ = ('path', 'pcm', 'sample_rate', 'queued_at', 'loaded', 'written', 'start_bytes')
+
+    def __init__(self, path, queued_at):
+        self.path = path
+        self.pcm = None
+        self.sample_rate = None
+        self.queued_at = queued_at
+        self.loaded = False
+        self.written = 0
+        self.start_bytes = 0
+
+    @property
+    def mode(self):
+        return 'pcm' if self.pcm is not None else 'media'
+
+
+class PlaybackEngine(QObject):
+
+    def __init__(self, parent=None, config=None, report=None):
+        super().__init__(parent)
+        config = config or {}
+        self.report = report
+        self.buffer_ms = config.get('buffer_ms', 100)
+        self.cache_clips = config.get('cache_clips', 16)
+        self.max_pcm_seconds = config.get('max_pcm_seconds', 60)
+
+        self.playlist = deque()
+        self.current = None
+        self.draining = False
+        self.pcm_cache = OrderedDict()
+        self.latencies = deque(maxlen=50)
+
+        self.output = None
+        self.device = None
+        self.output_rate = None
+        self.total_written = 0
+        self.pending_starts = deque()
+
+        self.feed_timer = QTimer(self)
+        self.feed_timer.setInterval(max(5, self.buffer_ms // 4))
+        self.feed_timer.timeout.connect(self.feed)
+
+        self.players = []
+        self.media_clips = {}
+
+    def enqueue(self, path, queued_at=None):
+        if not path or not os.path.exists(path):
+            return
+        self.playlist.append(Clip(path, queued_at or time.time()))
+        self.advance()
+        self.preload()
+        if self.output is not None:
+            self.feed()
+
+    def load(self, clip):
+        if clip.loaded:
+            return
+        clip.loaded = True
+        cached = self.pcm_cache.get(clip.path)
+        if cached is not None:
+            self.pcm_cache.move_to_end(clip.path)
+            clip.pcm, clip.sample_rate = cached
+            return
+        if not clip.path.lower().endswith('.wav'):
+            return
+        try:
+            pcm, sample_rate = read_wav(clip.path)
+        except Exception:
+            return
+        if pcm and pcm_duration(pcm, sample_rate) <= self.max_pcm_seconds:
+            clip.pcm, clip.sample_rate = pcm, sample_rate
+            self.pcm_cache[clip.path] = (pcm, sample_rate)
+            while len(self.pcm_cache) > self.cache_clips:
+                self.pcm_cache.popitem(last=False)
+
+    def preload(self):
+        if not self.playlist:
+            return
+        clip = self.playlist[0]
+        self.load(clip)
+        if clip.pcm is None and clip not in self.media_clips:
+            player = self.idle_player()
+            if player is not None:
+                self.set_media(player, clip)
+
+    def continues_stream(self, clip):
+        return self.output is not None and clip.pcm is not None and clip.sample_rate == self.output_rate
+
+    def advance(self):
+        if self.current is not None or self.draining or not self.playlist:
+            return
+        clip = self.playlist[0]
+        self.load(clip)
+        if self.output is not None and not self.continues_stream(clip):
+            if not self.drained():
+                self.draining = True
+                return
+            self.close_output()
+
+        self.playlist.popleft()
+        self.current = clip
+        if clip.pcm is None or not self.start_pcm(clip):
+            clip.pcm = None
+            self.start_media(clip)
+
+    def open_output(self, sample_rate):
+        from PyQt5.QtMultimedia import QAudio, QAudioDeviceInfo, QAudioFormat, QAudioOutput
+
+        audio_format = QAudioFormat()
+        audio_format.setSampleRate(sample_rate)
+        audio_format.setChannelCount(PCM_CHANNELS)
+        audio_format.setSampleSize(PCM_SAMPLE_WIDTH * 8)
+        audio_format.setCodec('audio/pcm')
+        audio_format.setByteOrder(QAudioFormat.LittleEndian)
+        audio_format.setSampleType(QAudioFormat.SignedInt)
+        if not QAudioDeviceInfo.defaultOutputDevice().isFormatSupported(audio_format):
+            return False
+
+        self.output = QAudioOutput(audio_format, self)
+        self.output.setBufferSize(int(sample_rate * PCM_SAMPLE_WIDTH * self.buffer_ms / 1000))
+        self.device = self.output.start()
+        if self.device is None or self.output.error() != QAudio.NoError:
+            self.close_output()
+            return False
+        self.output_rate = sample_rate
+        self.total_written = 0
+        return True
+
+    def close_output(self):
+        if self.output is not None:
+            self.output.stop()
+            self.output.deleteLater()
+        self.output = None
+        self.device = None
+        self.output_rate = None
+        self.total_written = 0
+        self.pending_starts.clear()
+
+    def start_pcm(self, clip):
+        if self.output is None:
+            try:
+                if not self.open_output(clip.sample_rate):
+                    return False
+            except Exception:
+                return False
+        clip.written = 0
+        clip.start_bytes = self.total_written
+        self.pending_starts.append(clip)
+        if not self.feed_timer.isActive():
+            self.feed_timer.start()
+        return True
+
+    def played_bytes(self):
+        return int(self.output.processedUSecs() * self.output_rate / 1000000) * PCM_SAMPLE_WIDTH * PCM_CHANNELS
+
+    def drained(self):
+        from PyQt5.QtMultimedia import QAudio
+        if self.output.state() == QAudio.IdleState or self.output.bytesFree() >= self.output.bufferSize():
+            return True
+        return self.played_bytes() + PCM_SAMPLE_WIDTH * PCM_CHANNELS >= self.total_written
+
+    def feed(self):
+        if self.output is None:
+            self.feed_timer.stop()
+            return
+
+        clip = self.current
+        while clip is not None and clip.pcm is not None:
+            free = self.output.bytesFree()
+            if free <= 0:
+                break
+            written = self.device.write(clip.pcm[clip.written:clip.written + free])
+            if written <= 0:
+                break
+            clip.written += written
+            self.total_written += written
+            if clip.written < len(clip.pcm):
+                break
+
+            self.current = None
+            self.advance()
+            self.preload()
+            if self.output is None:
+                return
+            clip = self.current
+
+        played = self.played_bytes()
+        while self.pending_starts and played > self.pending_starts[0].start_bytes:
+            self.record_latency(self.pending_starts.popleft())
+
+        if self.current is None and self.drained():
+            self.draining = False
+            if self.playlist:
+                self.advance()
+            else:
+                self.close_output()
+                self.feed_timer.stop()
+
+    def idle_player(self):
+        busy = set(map(id, self.media_clips.values()))
+        for player in self.players:
+            if id(player) not in busy:
+                return player
+        if len(self.players) < 2:
+            from PyQt5.QtMultimedia import QMediaPlayer
+            player = QMediaPlayer(self)
+            player.mediaStatusChanged.connect(lambda status, p=player: self.on_media_status(p, status))
+            player.positionChanged.connect(lambda position, p=player: self.on_media_position(p, position))
+            self.players.append(player)
+            return player
+        return None
+
+    def set_media(self, player, clip):
+        from PyQt5.QtMultimedia import QMediaContent
+        self.media_clips[clip] = player
+        player.setMedia(QMediaContent(QUrl.fromLocalFile(clip.path)))
+
+    def release_player(self, player):
+        for clip, owner in list(self.media_clips.items()):
+            if owner is player:
+                del self.media_clips[clip]
+
+    def start_media(self, clip):
+        try:
+            player = self.media_clips.get(clip)
+            if player is None:
+                player = self.idle_player()
+                if player is None:
+                    player = self.players[0]
+                    player.stop()
+                    self.release_player(player)
+                self.set_media(player, clip)
+            player.play()
+        except Exception:
+            self.media_clips.pop(clip, None)
+            self.current = None
+            self.advance()
+
+    def on_media_position(self, player, position):
+        clip = self.current
+        if clip is not None and position > 0 and self.media_clips.get(clip) is player:
+            self.record_latency(clip)
+
+    def on_media_status(self, player, status):
+        from PyQt5.QtMultimedia import QMediaPlayer
+        if status not in (QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+            return
+        clip = self.current
+        if clip is None or self.media_clips.get(clip) is not player:
+            return
+        self.release_player(player)
+        self.current = None
+        self.advance()
+        self.preload()
+        if self.output is not None:
+            self.feed()
+
+    def record_latency(self, clip):
+        if not clip.queued_at:
+            return
+        stats = {
+            'clip': os.path.basename(clip.path),
+            'mode': clip.mode,
+            'latency_ms': (time.time() - clip.queued_at) * 1000,
+        }
+        clip.queued_at = None
+        self.latencies.append(stats)
+        if self.report:
+            self.report(stats)
+
+    def stop(self):
+        self.playlist.clear()
+        self.current = None
+        self.draining = False
+        self.feed_timer.stop()
+        self.close_output()
+        for player in self.players:
+            player.stop()
+        self.media_clips.clear()
@@ -0,0 +1,308 @@
+import http.client
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+
+
+class EndpointError(Exception):
+    pass
+
+
+class Endpoint:
+
+    def __init__(self, config, defaults=None, window=100):
+        defaults = defaults or {}
+        url = config.get('api_url') or defaults.get('api_url', 'api.qhaigc.net')
+        if '://' not in url:
+            url = f"https://{url}"
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.path = parts.path.rstrip('/') + '/v1/audio/speech'
+        self.model = config.get('model') or defaults.get('model', 'qhai-tts:永雏塔菲')
+        self.api_key = config.get('api_key') or defaults.get('api_key', '')
+        self.name = config.get('name') or f"{self.host}|{self.model}"
+
+        self.latency = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=window)
+        self.failures = 0
+        self.down_until = 0.0
+        self.last_used = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.cancelled = 0
+
+    def connect(self, timeout):
+        if self.scheme == 'http':
+            return http.client.HTTPConnection(self.host, timeout=timeout)
+        return http.client.HTTPSConnection(self.host, timeout=timeout)
+
+    def healthy(self, now):
+        return now >= self.down_until
+
+    def p95(self, min_samples=10):
+        if len(self.samples) < min_samples:
+            return None
+        values = sorted(self.samples)
+        return values[int(len(values) * 0.95)]
+
+    def score(self, error_penalty):
+        if self.latency is None:
+            return 0.0
+        return self.latency + self.error_rate * error_penalty
+
+    def observe(self, elapsed, alpha, outlier_factor=4):
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += alpha * (min(elapsed, self.latency * outlier_factor) - self.latency)
+        self.samples.append(elapsed)
+
+    def stats(self):
+        p95 = self.p95()
+        return {
+            'name': self.name,
+            'model': self.model,
+            'latency_ms': self.latency * 1000 if self.latency is not None else None,
+            'p95_ms': p95 * 1000 if p95 is not None else None,
+            'error_rate': self.error_rate,
+            'healthy': self.healthy(time.monotonic()),
+            'requests': self.requests,
+            'errors': self.errors,
+            'wins': self.wins,
+            'cancelled': self.cancelled,
+        }
+
+
+class Call:
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.conn = None
+        self.cancelled = False
+        self.started = None
+        self.future = None
+        self.hedged = False
+
+    def cancel(self):
+        self.cancelled = True
+        conn = self.conn
+        if conn is not None and conn.sock is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+
+
+class EndpointRouter:
+
+    def __init__(self, endpoints, config=None):
+        config = config or {}
+        self.endpoints = endpoints
+        self.alpha = config.get('alpha', 0.2)
+        self.error_penalty = config.get('error_penalty_ms', 3000) / 1000.0
+        self.max_failures = config.get('max_failures', 3)
+        self.cooldown = config.get('cooldown', 30)
+        self.probe_interval = config.get('probe_interval', 60)
+        self.timeout = config.get('timeout', 30)
+        self.hedge = config.get('hedge', True) and len(endpoints) > 1
+        self.hedge_after = config.get('hedge_after_ms', 1500) / 1000.0
+        self.hedge_rate = config.get('hedge_rate', 0.1)
+        self.hedge_burst = config.get('hedge_burst', 3)
+        concurrency = max(1, config.get('concurrency', 8))
+
+        self.tokens = self.hedge_burst
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency * (len(endpoints) + 1))
+        self.probing = False
+        self.probes = 0
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def rank(self):
+        now = time.monotonic()
+        with self.lock:
+            healthy = [e for e in self.endpoints if e.healthy(now)]
+            down = sorted((e for e in self.endpoints if not e.healthy(now)), key=lambda e: e.down_until)
+            healthy.sort(key=lambda e: e.score(self.error_penalty))
+        return healthy, down
+
+    def hedge_delay(self, endpoint):
+        with self.lock:
+            p95 = endpoint.p95()
+        return p95 if p95 is not None else self.hedge_after
+
+    def take_token(self):
+        with self.lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.hedges += 1
+                return True
+            return False
+
+    def start(self, endpoint, build, accept):
+        call = Call(endpoint)
+        with self.lock:
+            endpoint.requests += 1
+            endpoint.last_used = time.monotonic()
+        call.future = self.executor.submit(self.send, call, build, accept)
+        return call
+
+    def send(self, call, build, accept):
+        if call.cancelled:
+            return None
+        call.started = time.perf_counter()
+        endpoint = call.endpoint
+        body, headers = build(endpoint)
+        conn = endpoint.connect(self.timeout)
+        call.conn = conn
+        try:
+            conn.connect()
+            if call.cancelled:
+                return None
+            conn.request("POST", endpoint.path, body, headers)
+            response = conn.getresponse()
+            data = response.read()
+            if call.cancelled:
+                return None
+            if not accept(response.status, response.getheader('Content-Type', '')):
+                raise EndpointError(f"{endpoint.name} 返回 {response.status}")
+            return data
+        finally:
+            conn.close()
+
+    def finish(self, call):
+        try:
+            data = call.future.result()
+        except Exception:
+            data = None
+        if data and call.started is not None:
+            elapsed = time.perf_counter() - call.started
+            with self.lock:
+                call.endpoint.observe(elapsed, self.alpha)
+                call.endpoint.error_rate *= 1 - self.alpha
+                call.endpoint.failures = 0
+        else:
+            self.fail(call.endpoint)
+        return data
+
+    def fail(self, endpoint):
+        with self.lock:
+            endpoint.errors += 1
+            endpoint.error_rate += self.alpha * (1 - endpoint.error_rate)
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.down_until = time.monotonic() + self.cooldown
+
+    def expire(self, call):
+        call.cancel()
+        self.fail(call.endpoint)
+
+    def abandon(self, call):
+        call.cancel()
+        with self.lock:
+            call.endpoint.cancelled += 1
+            if call.started is None:
+                return
+            elapsed = time.perf_counter() - call.started
+            if call.endpoint.latency is None or elapsed > call.endpoint.latency:
+                call.endpoint.observe(elapsed, self.alpha)
+
+    def probe(self, candidates, build, accept):
+        now = time.monotonic()
+        with self.lock:
+            stale = [e for e in candidates if now - e.last_used > self.probe_interval]
+            if self.probing or not stale:
+                return
+            self.probing = True
+            self.probes += 1
+        call = self.start(min(stale, key=lambda e: e.last_used), build, accept)
+        call.future.add_done_callback(lambda future: self.probed(call))
+
+    def probed(self, call):
+        self.finish(call)
+        with self.lock:
+            self.probing = False
+
+    def request(self, build, accept):
+        healthy, down = self.rank()
+        queue = healthy + down
+        if not queue:
+            return None
+
+        with self.lock:
+            self.requests += 1
+            self.tokens = min(self.hedge_burst, self.tokens + self.hedge_rate)
+
+        primary = self.start(queue.pop(0), build, accept)
+        self.probe(healthy[1:], build, accept)
+        pending = {primary.future: primary}
+        hedge_pending = self.hedge and len(healthy) > 1
+        hedge_at = None
+
+        while pending:
+            if hedge_pending and primary.started is not None:
+                hedge_pending = False
+                hedge_at = primary.started + self.hedge_delay(primary.endpoint)
+
+            wakes = [call.started + self.timeout for call in pending.values() if call.started is not None]
+            if hedge_at is not None:
+                wakes.append(hedge_at)
+            timeout = max(0, min(wakes) - time.perf_counter()) if wakes else None
+            if hedge_pending or any(call.started is None for call in pending.values()):
+                timeout = 0.05 if timeout is None else min(timeout, 0.05)
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                call = pending.pop(future)
+                data = self.finish(call)
+                if data:
+                    for other in pending.values():
+                        self.abandon(other)
+                    with self.lock:
+                        call.endpoint.wins += 1
+                        if call.hedged:
+                            self.hedge_wins += 1
+                    return call.endpoint, data
+
+            now = time.perf_counter()
+            for future, call in list(pending.items()):
+                if call.started is not None and now >= call.started + self.timeout:
+                    del pending[future]
+                    self.expire(call)
+
+            if not pending and queue:
+                with self.lock:
+                    self.failovers += 1
+                call = self.start(queue.pop(0), build, accept)
+                pending[call.future] = call
+            elif hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if queue and queue[0].healthy(time.monotonic()) and self.take_token():
+                    call = self.start(queue.pop(0), build, accept)
+                    call.hedged = True
+                    pending[call.future] = call
+
+        return None
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'hedge_rate': self.hedges / self.requests if self.requests else 0.0,
+                'hedge_wins': self.hedge_wins,
+                'failovers': self.failovers,
+                'probes': self.probes,
+                'endpoints': [endpoint.stats() for endpoint in self.endpoints],
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
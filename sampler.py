@@ -0,0 +1,83 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(duration, interval=0.005, include_idle=False):
+    stacks = Counter()
+    own = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    deadline = time.perf_counter() + duration
+    samples = 0
+
+    while time.perf_counter() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if not include_idle and labels and labels[0].startswith(('wait ', 'select ', 'get ', '_wait_for_tstate_lock ')):
+                continue
+            labels.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[';'.join(reversed(labels))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    return stacks, samples
+
+
+def write_collapsed(stacks, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+def top_functions(stacks, limit=8):
+    own = Counter()
+    total = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for label in set(frames):
+            total[label] += count
+    all_samples = sum(stacks.values()) or 1
+    return [
+        {'function': label, 'self': count / all_samples, 'total': total[label] / all_samples}
+        for label, count in own.most_common(limit)
+    ]
+
+
+def profile(path, duration=10, interval=0.005, limit=8):
+    stacks, samples = sample_stacks(duration, interval)
+    write_collapsed(stacks, path)
+    return {
+        'path': path,
+        'samples': samples,
+        'stacks': sum(stacks.values()),
+        'top': top_functions(stacks, limit),
+    }
+
+
+def format_report(name, result):
+    if not result:
+        return f"{name}：没有采样结果"
+    if result.get('error'):
+        return f"{name}：采样失败 {result['error']}"
+    lines = [f"{name}：{result['samples']} 次采样，火焰图数据 {result['path']}"]
+    for item in result['top']:
+        lines.append(f"{item['self'] * 100:5.1f}% (含子调用 {item['total'] * 100:5.1f}%) {item['function']}")
+    return "\n".join(lines)
@@ -0,0 +1,72 @@
+import re
+import time
+
+EMOTION_PATTERN = r'\[:([\w\u4e00-\u9fa5]+)\]'
+TAG_PREFIX_PATTERN = re.compile(r'\[(?::[\w\u4e00-\u9fa5]*)?$')
+
+
+class EmotionStreamParser:
+
+    def __init__(self, emotion_pattern=EMOTION_PATTERN):
+        self.emotion_pattern = re.compile(emotion_pattern)
+        self.pending = ''
+
+    def feed(self, chunk):
+        data = self.pending + (chunk or '')
+        self.pending = ''
+
+        emotions = self.emotion_pattern.findall(data)
+        text = self.emotion_pattern.sub('', data)
+
+        partial = TAG_PREFIX_PATTERN.search(text)
+        if partial:
+            self.pending = partial.group()
+            text = text[:partial.start()]
+
+        return text, emotions
+
+    def flush(self):
+        text = self.pending
+        self.pending = ''
+        return text
+
+
+class StreamState:
+
+    def __init__(self, started=None):
+        self.parser = EmotionStreamParser()
+        self.started = started or time.time()
+        self.first_chunk = None
+        self.raw = ''
+        self.emotion = None
+        self.chunks = 0
+
+
+def conversation_key(event):
+    launcher_type = getattr(event, 'launcher_type', None)
+    launcher_id = getattr(event, 'launcher_id', None)
+    query = getattr(event, 'query', None)
+    if launcher_id is None and query is not None:
+        launcher_type = getattr(query, 'launcher_type', None)
+        launcher_id = getattr(query, 'launcher_id', None)
+    if launcher_id is None:
+        return None
+    return f"{launcher_type}_{launcher_id}"
+
+
+def sender_key(event):
+    sender_id = getattr(event, 'sender_id', None)
+    query = getattr(event, 'query', None)
+    if sender_id is None and query is not None:
+        sender_id = getattr(query, 'sender_id', None)
+    if sender_id is None:
+        return None
+    return str(sender_id)
+
+
+def query_text(event):
+    query = getattr(event, 'query', None)
+    chain = getattr(query, 'message_chain', None) if query is not None else None
+    if chain is None:
+        return ''
+    return str(chain).strip()
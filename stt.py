@@ -0,0 +1,215 @@
+import os
+import base64
+import hashlib
+import http.client
+import json
+import tempfile
+import time
+import urllib.request
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from .audio import voice_segments, split_chunks, pcm_to_wav, pcm_duration, sniff_format, wav_to_pcm
+from .codec import is_silk
+
+STT_SAMPLE_RATE = 16000
+
+TranscriptResult = namedtuple('TranscriptResult', ['text', 'duration', 'elapsed', 'chunks', 'cached'])
+
+
+def load_voice(component, timeout=10):
+    path = getattr(component, 'path', None)
+    if path and os.path.exists(str(path)):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    data = getattr(component, 'base64', None)
+    if data:
+        if ',' in data and data.startswith('data:'):
+            data = data.split(',', 1)[1]
+        return base64.b64decode(data)
+
+    url = getattr(component, 'url', None)
+    if url:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.read()
+    return None
+
+
+class QhaiSTT:
+
+    def __init__(self, config=None, codec=None):
+        self.config = config or {}
+        self.codec = codec
+        self.api_key = self.config.get('api_key', '')
+        self.model = self.config.get('model', 'qhai-stt:general')
+        self.language = self.config.get('language', 'zh')
+        self.max_chunk_seconds = self.config.get('max_chunk_seconds', 15)
+        self.concurrency = max(1, self.config.get('concurrency', 4))
+        self.timeout = self.config.get('timeout', 30)
+        self.vad = self.config.get('vad', True)
+
+        url = self.config.get('api_url', 'api.qhaigc.net')
+        if '://' not in url:
+            url = f"https://{url}"
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.path = parts.path.rstrip('/') + '/v1/audio/transcriptions'
+
+        self.plugin_dir = os.path.dirname(os.path.abspath(__file__))
+        self.cache_dir = self.config.get('cache_dir') or os.path.join(self.plugin_dir, 'audio_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self.transcribed = 0
+        self.failed = 0
+        self.last_error = None
+
+    def cache_key(self, data):
+        digest = hashlib.sha1(data)
+        digest.update(f"|{self.model}|{self.language}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def cache_path(self, key):
+        return os.path.join(self.cache_dir, f"stt_{key}.txt")
+
+    def find_cached(self, key):
+        path = self.cache_path(key)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except Exception:
+                pass
+        return None
+
+    def transcribe_bytes(self, data):
+        if not data:
+            return None
+        start = time.perf_counter()
+        key = self.cache_key(data)
+        cached = self.find_cached(key)
+        if cached is not None:
+            return TranscriptResult(cached, None, time.perf_counter() - start, 0, True)
+
+        if is_silk(data) and (self.codec is None or not self.codec.can_decode_silk()):
+            return self.fail("没有可用的silk解码器，请安装 silk-python 或把 silk_v3_decoder 放入 ffmpeg 目录")
+
+        pcm = self.decode(data)
+        if not pcm:
+            return self.fail("语音解码失败")
+
+        result = self.transcribe_pcm(pcm, STT_SAMPLE_RATE)
+        if result is None:
+            return self.fail("语音识别请求失败")
+        self.transcribed += 1
+
+        try:
+            with open(self.cache_path(key), 'w', encoding='utf-8') as f:
+                f.write(result.text)
+        except Exception:
+            pass
+        return result._replace(elapsed=time.perf_counter() - start)
+
+    def fail(self, reason):
+        self.failed += 1
+        self.last_error = reason
+        return None
+
+    def transcribe_file(self, path):
+        with open(path, 'rb') as f:
+            return self.transcribe_bytes(f.read())
+
+    def decode(self, data):
+        if sniff_format(data) == 'wav':
+            pcm, sample_rate = wav_to_pcm(data)
+            if pcm and sample_rate == STT_SAMPLE_RATE:
+                return pcm
+        if self.codec is None:
+            return None
+        fd, path = tempfile.mkstemp(suffix='.silk' if is_silk(data) else '.audio')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if is_silk(data):
+                return self.codec.decode_silk(path, STT_SAMPLE_RATE)
+            return self.codec.decode(path, STT_SAMPLE_RATE)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def transcribe_pcm(self, pcm, sample_rate=STT_SAMPLE_RATE):
+        start = time.perf_counter()
+        duration = pcm_duration(pcm, sample_rate)
+
+        if self.vad:
+            segments = voice_segments(pcm, sample_rate)
+        else:
+            segments = [(0, len(pcm))]
+        if not segments:
+            return TranscriptResult('', duration, time.perf_counter() - start, 0, False)
+
+        chunks = split_chunks(pcm, segments, sample_rate, self.max_chunk_seconds)
+        texts = list(self.executor.map(lambda chunk: self.upload(chunk, sample_rate), chunks))
+        if any(text is None for text in texts):
+            return None
+
+        text = ''.join(t.strip() for t in texts)
+        return TranscriptResult(text, duration, time.perf_counter() - start, len(chunks), False)
+
+    def connect(self):
+        if self.scheme == 'http':
+            return http.client.HTTPConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+
+    def upload(self, pcm, sample_rate):
+        boundary = uuid.uuid4().hex
+        fields = [('model', self.model), ('language', self.language), ('response_format', 'json')]
+
+        body = b''
+        for name, value in fields:
+            body += (
+                f"--{boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                f"{value}\r\n"
+            ).encode('utf-8')
+        body += (
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"file\"; filename=\"voice.wav\"\r\n"
+            f"Content-Type: audio/wav\r\n\r\n"
+        ).encode('utf-8')
+        body += pcm_to_wav(pcm, sample_rate)
+        body += f"\r\n--{boundary}--\r\n".encode('utf-8')
+
+        headers = {
+            'Authorization': self.api_key,
+            'User-Agent': 'Wife_image/1.0.0',
+            'Content-Type': f"multipart/form-data; boundary={boundary}",
+            'Accept': 'application/json',
+        }
+
+        conn = None
+        try:
+            conn = self.connect()
+            conn.request("POST", self.path, body, headers)
+            response = conn.getresponse()
+            data = response.read()
+            if response.status != 200:
+                return None
+            return json.loads(data.decode('utf-8')).get('text', '')
+        except Exception:
+            return None
+        finally:
+            if conn:
+                conn.close()
+
+    def stats(self):
+        return {
+            'transcribed': self.transcribed,
+            'failed': self.failed,
+            'last_error': self.last_error,
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
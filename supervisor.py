@@ -0,0 +1,243 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from .timing import StartupTimer
+
+DROPPABLE_TYPES = ('emotion', 'message', 'message_chunk', 'audio', 'ping')
+LISTENED_TYPES = ('activity', 'profile', 'touch')
+
+
+def run_ui(config_path, config, msg_queue, status_queue, origin=None):
+    startup = StartupTimer(origin)
+    startup.mark('ui_process_start')
+    from .ui import start_ui
+    startup.mark('qt_imported')
+    start_ui(config_path, msg_queue, status_queue, config, startup)
+
+
+class UISupervisor:
+
+    def __init__(self, config_path, config=None, startup=None):
+        self.config_path = config_path
+        self.ui_config = config or {}
+        self.config = self.ui_config.get('process', {})
+        self.queue_size = self.config.get('queue_size', 32)
+        self.heartbeat_interval = self.config.get('heartbeat_interval', 2)
+        self.heartbeat_timeout = self.config.get('heartbeat_timeout', 15)
+        self.min_backoff = self.config.get('restart_backoff', 1)
+        self.max_backoff = self.config.get('max_restart_backoff', 60)
+        self.context = self.create_context(self.config.get('start_method', 'spawn'))
+        self.startup = startup or StartupTimer()
+
+        self.msg_queue = None
+        self.status_queue = None
+        self.process = None
+        self.lock = threading.Lock()
+        self.running = False
+        self.monitor_thread = None
+        self.sender_thread = None
+        self.outbox = deque()
+        self.outbox_ready = threading.Condition()
+        self.in_flight = None
+
+        self.started_at = 0
+        self.last_heartbeat = 0
+        self.backoff = self.min_backoff
+        self.next_restart = 0
+
+        self.latency = None
+        self.last_latency = None
+        self.dropped = 0
+        self.restarts = 0
+        self.first_glyph = deque(maxlen=50)
+        self.playback = deque(maxlen=50)
+        self.activity = None
+        self.ui_metrics = None
+        self.listeners = []
+
+    def create_context(self, method):
+        if method not in multiprocessing.get_all_start_methods():
+            method = 'spawn'
+        context = multiprocessing.get_context(method)
+        if method == 'forkserver':
+            context.set_forkserver_preload([f"{__package__}.ui"])
+        return context
+
+    def start(self):
+        with self.lock:
+            self.spawn()
+        self.running = True
+        self.monitor_thread = threading.Thread(target=self.monitor, daemon=True)
+        self.monitor_thread.start()
+        self.sender_thread = threading.Thread(target=self.send_loop, daemon=True)
+        self.sender_thread.start()
+
+    def spawn(self):
+        config = self.ui_config
+        if self.process:
+            self.startup = StartupTimer()
+            self.startup.mark('ui_restart')
+            config = None
+        self.msg_queue = self.context.Queue(self.queue_size)
+        self.status_queue = self.context.Queue()
+        self.process = self.context.Process(
+            target=run_ui,
+            args=(self.config_path, config, self.msg_queue, self.status_queue, self.startup.origin)
+        )
+        self.process.daemon = True
+        self.process.start()
+        self.started_at = time.time()
+        self.last_heartbeat = self.started_at
+
+    def put(self, msg):
+        with self.outbox_ready:
+            if not self.msg_queue:
+                return False
+            self.outbox.append(msg)
+            while len(self.outbox) > self.queue_size and self.drop_oldest():
+                pass
+            self.outbox_ready.notify()
+        return True
+
+    def drop_oldest(self):
+        for i, queued in enumerate(self.outbox):
+            if queued is not self.in_flight and queued.get('type') in DROPPABLE_TYPES:
+                del self.outbox[i]
+                self.dropped += 1
+                return True
+        return False
+
+    def send_loop(self):
+        while self.running:
+            with self.outbox_ready:
+                if not self.outbox:
+                    self.outbox_ready.wait(0.5)
+                    continue
+                msg = self.in_flight = self.outbox[0]
+                msg_queue = self.msg_queue
+            sent = False
+            try:
+                msg_queue.put(msg, timeout=0.2)
+                sent = True
+            except queue.Full:
+                pass
+            except Exception:
+                time.sleep(0.2)
+            with self.outbox_ready:
+                self.in_flight = None
+                if sent and self.outbox and self.outbox[0] is msg:
+                    self.outbox.popleft()
+
+    def monitor(self):
+        while self.running:
+            try:
+                self.drain_status()
+                if self.is_healthy():
+                    if time.time() - self.started_at > self.max_backoff:
+                        self.backoff = self.min_backoff
+                    self.put({'type': 'ping', 'content': time.time(), 'timestamp': time.time()})
+                else:
+                    self.restart()
+            except Exception:
+                pass
+            time.sleep(self.heartbeat_interval)
+
+    def drain_status(self):
+        while self.status_queue:
+            try:
+                msg = self.status_queue.get_nowait()
+            except queue.Empty:
+                return
+            except Exception:
+                return
+            self.handle_status(msg)
+
+    def handle_status(self, msg):
+        msg_type = msg.get('type')
+        now = time.time()
+        if msg_type == 'heartbeat':
+            self.last_heartbeat = now
+            if msg.get('content'):
+                self.ui_metrics = msg['content']
+        elif msg_type == 'pong':
+            self.last_heartbeat = now
+            self.last_latency = (msg.get('timestamp') or now) - msg['content']
+            if self.latency is None:
+                self.latency = self.last_latency
+            else:
+                self.latency = self.latency * 0.8 + self.last_latency * 0.2
+        elif msg_type == 'first_glyph':
+            self.first_glyph.append(msg['content'])
+        elif msg_type == 'playback':
+            self.playback.append(msg['content'])
+        elif msg_type == 'startup':
+            self.last_heartbeat = now
+            self.startup.merge(msg['content'])
+        elif msg_type == 'activity':
+            self.activity = msg['content']
+
+        if msg_type in LISTENED_TYPES:
+            for listener in self.listeners:
+                try:
+                    listener(msg)
+                except Exception:
+                    pass
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def is_healthy(self):
+        if not self.process or not self.process.is_alive():
+            return False
+        return time.time() - self.last_heartbeat < self.heartbeat_timeout
+
+    def restart(self):
+        now = time.time()
+        if now < self.next_restart:
+            return
+        with self.lock:
+            self.terminate()
+            self.spawn()
+        self.restarts += 1
+        self.next_restart = now + self.backoff
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+
+    def terminate(self):
+        if self.process and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(3)
+        for q in (self.msg_queue, self.status_queue):
+            if q:
+                q.cancel_join_thread()
+                q.close()
+
+    def stats(self):
+        return {
+            'alive': bool(self.process and self.process.is_alive()),
+            'restarts': self.restarts,
+            'dropped': self.dropped,
+            'outbox': len(self.outbox),
+            'queue_size': self.queue_size,
+            'heartbeat_age': time.time() - self.last_heartbeat if self.last_heartbeat else None,
+            'latency': self.latency,
+            'last_latency': self.last_latency,
+            'startup': self.startup.report(),
+            'first_glyph': list(self.first_glyph),
+            'playback': list(self.playback),
+            'activity': self.activity,
+            'ui_metrics': self.ui_metrics,
+        }
+
+    def stop(self):
+        self.running = False
+        with self.lock:
+            try:
+                if self.msg_queue:
+                    self.msg_queue.put_nowait({'type': 'exit', 'content': None})
+            except Exception:
+                pass
+            if self.process and self.process.is_alive():
+                self.process.join(0.5)
+            self.terminate()
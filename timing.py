@@ -0,0 +1,33 @@
+import time
+
+
+class StartupTimer:
+
+    def __init__(self, origin=None, marks=None):
+        self.origin = origin if origin is not None else time.time()
+        self.marks = list(marks or [])
+
+    def mark(self, name):
+        self.marks.append((name, time.time()))
+
+    def merge(self, marks):
+        self.marks.extend(marks)
+        self.marks.sort(key=lambda item: item[1])
+
+    def report(self):
+        rows = []
+        previous = self.origin
+        for name, timestamp in self.marks:
+            rows.append({
+                'stage': name,
+                'elapsed_ms': round((timestamp - self.origin) * 1000, 1),
+                'delta_ms': round((timestamp - previous) * 1000, 1),
+            })
+            previous = timestamp
+        return rows
+
+    def format_report(self):
+        lines = ["启动耗时（距插件加载）:"]
+        for row in self.report():
+            lines.append(f"  {row['stage']:<20} {row['elapsed_ms']:>9.1f} ms  (+{row['delta_ms']:.1f} ms)")
+        return "\n".join(lines)
@@ -1,20 +1,33 @@
 import os
-import http.client
+import hashlib
 import json
 import re
 import time
+from collections import namedtuple, deque
+from .audio import FORMAT_EXTENSIONS, sniff_format, wav_to_pcm, write_wav, trim_and_normalize, pcm_duration, PCM_SAMPLE_RATE
+from .routing import Endpoint, EndpointRouter
+
+TTSResult = namedtuple('TTSResult', ['path', 'pcm', 'sample_rate'])
 
 class QhaiTTS:
 
     def __init__(self, config=None):
         self.config = config or {}
         self.api_key = config.get('api_key', '')
-        self.api_url = config.get('api_url', 'api.qhaigc.net').replace('https://', '').replace('http://', '')
         self.model = config.get('model', 'qhai-tts:永雏塔菲')
+        self.endpoints = [Endpoint(endpoint, config) for endpoint in config.get('endpoints') or [{}]]
+        self.router = EndpointRouter(self.endpoints, config.get('routing', {}))
         self.max_text_length = config.get('max_text_length', 300)
+        self.response_format = config.get('response_format', 'pcm')
+        if self.response_format not in FORMAT_EXTENSIONS:
+            self.response_format = 'mp3'
+        
+        self.post_process = config.get('post_process', {})
+        self.post_process_enabled = self.post_process.get('enabled', True)
+        self.processed = deque(maxlen=50)
 
         self.plugin_dir = os.path.dirname(os.path.abspath(__file__))
-        self.cache_dir = os.path.join(self.plugin_dir, 'audio_cache')
+        self.cache_dir = config.get('cache_dir') or os.path.join(self.plugin_dir, 'audio_cache')
         os.makedirs(self.cache_dir, exist_ok=True)
     
     def clean_text(self, text):
@@ -165,7 +178,23 @@ class QhaiTTS:
         
         return text
     
+    def cache_key(self, text):
+        post = 'post' if self.post_process_enabled else 'raw'
+        models = '+'.join(sorted(set(endpoint.model for endpoint in self.endpoints)))
+        return hashlib.sha1(f"{models}|{self.response_format}|{post}|{text}".encode('utf-8')).hexdigest()[:16]
+    
+    def find_cached(self, key):
+        for ext in sorted(set(FORMAT_EXTENSIONS.values())):
+            path = os.path.join(self.cache_dir, f"tts_{key}{ext}")
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                return path
+        return None
+    
     def text_to_speech(self, text):
+        result = self.synthesize(text)
+        return result.path if result else None
+    
+    def synthesize(self, text):
         if not text:
             return None
             
@@ -176,51 +205,101 @@ class QhaiTTS:
         
         if not text:
             return None
+        
+        key = self.cache_key(text)
+        cached_path = self.find_cached(key)
+        if cached_path:
+            return TTSResult(cached_path, None, PCM_SAMPLE_RATE)
             
-        if not self.api_key:
+        if not any(endpoint.api_key for endpoint in self.endpoints):
             return None
         
-        try:
-            conn = http.client.HTTPSConnection(self.api_url)
-            
-            payload = json.dumps({
-                "model": self.model,
-                "input": text
-            })
-            
+        body = {"input": text}
+        if self.response_format != 'mp3':
+            body["response_format"] = self.response_format
+        
+        def build(endpoint):
+            payload = json.dumps(dict(body, model=endpoint.model))
             headers = {
-                'Authorization': self.api_key,
+                'Authorization': endpoint.api_key,
                 'User-Agent': 'Wife_image/1.0.0',
                 'Content-Type': 'application/json',
                 'Accept': '*/*',
-                'Host': self.api_url,
+                'Host': endpoint.host,
                 'Connection': 'keep-alive'
             }
-            
-            conn.request("POST", "/v1/audio/speech", payload, headers)
-            
-            response = conn.getresponse()
-            
-            data = response.read()
-            
-            if response.status == 200 and response.getheader('Content-Type', '').startswith('audio/'):
-                timestamp = int(time.time())
-                filename = f"tts_{timestamp}.mp3"
-                output_path = os.path.join(self.cache_dir, filename)
-                
-                with open(output_path, "wb") as f:
-                    f.write(data)
-                
-                return output_path
-            else:
-                try:
-                    error_msg = data.decode("utf-8")
-                except UnicodeDecodeError:
-                    error_msg = "无法解码的错误响应"
-                
-                return None
-                
-        except Exception as e:
+            return payload, headers
+        
+        try:
+            routed = self.router.request(build, self.accept_response)
+        except Exception:
+            return None
+        if routed is None:
+            return None
+        return self.save_audio(key, routed[1])
+    
+    def accept_response(self, status, content_type):
+        return status == 200 and (content_type.startswith('audio/') or content_type.startswith('application/octet-stream'))
+    
+    def save_audio(self, key, data):
+        audio_format = sniff_format(data, self.response_format)
+        if audio_format is None:
+            return None
+        
+        pcm, sample_rate = None, PCM_SAMPLE_RATE
+        if audio_format == 'pcm':
+            pcm = data
+        elif audio_format == 'wav':
+            pcm, sample_rate = wav_to_pcm(data)
+        
+        if pcm and self.post_process_enabled:
+            pcm = self.process_pcm(pcm, sample_rate)
+        
+        if pcm:
+            output_path = os.path.join(self.cache_dir, f"tts_{key}.wav")
+            write_wav(output_path, pcm, sample_rate)
+            return TTSResult(output_path, pcm, sample_rate)
+        
+        if audio_format == 'pcm':
             return None
-        finally:
-            conn.close()
\ No newline at end of file
+        
+        output_path = os.path.join(self.cache_dir, f"tts_{key}{FORMAT_EXTENSIONS[audio_format]}")
+        with open(output_path, "wb") as f:
+            f.write(data)
+        
+        return TTSResult(output_path, None, PCM_SAMPLE_RATE)
+    
+    def process_pcm(self, pcm, sample_rate):
+        start = time.perf_counter()
+        try:
+            processed, gain = trim_and_normalize(
+                pcm,
+                sample_rate,
+                self.post_process.get('silence_db', -45),
+                self.post_process.get('target_dbfs', -18),
+                self.post_process.get('peak_dbfs', -1),
+                self.post_process.get('padding_ms', 80)
+            )
+        except Exception:
+            return pcm
+        
+        self.processed.append({
+            'bytes_saved': len(pcm) - len(processed),
+            'ms_saved': (pcm_duration(pcm, sample_rate) - pcm_duration(processed, sample_rate)) * 1000,
+            'gain': gain,
+            'process_ms': (time.perf_counter() - start) * 1000,
+        })
+        return processed
+    
+    def stats(self):
+        clips = list(self.processed)
+        return {
+            'clips': len(clips),
+            'bytes_saved': sum(clip['bytes_saved'] for clip in clips),
+            'ms_saved': sum(clip['ms_saved'] for clip in clips),
+            'recent': clips[-5:],
+            'routing': self.router.stats(),
+        }
+    
+    def close(self):
+        self.router.close()
@@ -3,12 +3,33 @@ import os
 import yaml
 import json
 import queue
+import time
+import threading
 import multiprocessing
+from collections import deque
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QMenu, QAction, QDesktopWidget, QFrame
-from PyQt5.QtGui import QPixmap, QPainter, QFont, QColor, QPen, QBrush, QFontMetrics
-from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal, pyqtSlot
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-from PyQt5.QtCore import QUrl
+from PyQt5.QtGui import QPixmap, QPainter, QFont, QColor, QPen, QBrush, QFontMetrics, QCursor
+from PyQt5.QtCore import Qt, QTimer, QObject, QEvent, pyqtSignal, pyqtSlot
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+    __import__(__package__)
+
+from .assets import build_dir, pick_level
+from .pixmaps import PixmapCache, build_entry, blend_frame, mask_region, DEFAULT_REGIONS
+from .idle import IdleMonitor, WakeupCounter, default_idle_source
+from .playback import PlaybackEngine
+
+class ImageLabel(QLabel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paint_times = deque(maxlen=600)
+    
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.paint_times.append(time.perf_counter() - start)
 
 class TextBubble(QFrame):
     def __init__(self, parent=None):
@@ -17,12 +38,23 @@ class TextBubble(QFrame):
         self.setAttribute(Qt.WA_TranslucentBackground)
         
         self.text = ""
+        self.raw_text = ""
+        self.pending_text = ""
+        self.stream_info = None
+        self.first_glyph_callback = None
         self.config = {}
         self.parent_widget = parent
+        self.dormant = False
         
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.hide)
         
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.setSingleShot(True)
+        self.repaint_timer.setInterval(50)
+        self.repaint_timer.timeout.connect(self.flush_pending_text)
+        self.paint_times = deque(maxlen=600)
+        
         self.hide()
     
     def set_config(self, config):
@@ -45,6 +77,9 @@ class TextBubble(QFrame):
         if not text:
             return
         
+        self.repaint_timer.stop()
+        self.pending_text = ""
+        self.raw_text = text
         self.text = self.format_text(text)
         self.calc_size_and_position()
         self.show()
@@ -53,6 +88,34 @@ class TextBubble(QFrame):
         duration = self.config.get('show_duration', 5) * 1000
         self.timer.start(duration)
     
+    def append_text(self, text, reset=False, stream_info=None):
+        if reset:
+            self.raw_text = ""
+            self.pending_text = ""
+            self.stream_info = stream_info
+        
+        self.pending_text += text
+        if not self.repaint_timer.isActive() and not self.dormant:
+            self.repaint_timer.start()
+    
+    def flush_pending_text(self):
+        if not self.pending_text:
+            return
+        
+        self.raw_text += self.pending_text
+        self.pending_text = ""
+        self.text = self.format_text(self.raw_text.lstrip())
+        self.calc_size_and_position()
+        self.show()
+        self.repaint()
+        
+        if self.stream_info and self.first_glyph_callback:
+            self.first_glyph_callback(self.stream_info)
+            self.stream_info = None
+        
+        self.timer.stop()
+        self.timer.start(self.config.get('show_duration', 5) * 1000)
+    
     def format_text(self, text):
         max_chars = self.config.get('max_chars_per_line', 30)
         max_lines = self.config.get('max_lines', 5)
@@ -92,6 +155,10 @@ class TextBubble(QFrame):
         if not self.parent_widget:
             return
         
+        self.calc_size()
+        self.reposition()
+    
+    def calc_size(self):
         font_height = self.font_metrics.height()
         lines = self.text.split('\n')
         max_width = 0
@@ -105,12 +172,16 @@ class TextBubble(QFrame):
         bubble_height = font_height * len(lines) + padding * 2
         
         self.resize(bubble_width, bubble_height)
+    
+    def reposition(self):
+        if not self.parent_widget:
+            return
         
         parent_pos = self.parent_widget.pos()
         parent_size = self.parent_widget.size()
         
-        x = parent_pos.x() + (parent_size.width() - bubble_width) // 2
-        y = parent_pos.y() - bubble_height - 10
+        x = parent_pos.x() + (parent_size.width() - self.width()) // 2
+        y = parent_pos.y() - self.height() - 10
         
         if y < 0:
             y = 0
@@ -118,6 +189,7 @@ class TextBubble(QFrame):
         self.move(x, y)
     
     def paintEvent(self, event):
+        start = time.perf_counter()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         
@@ -159,38 +231,91 @@ class TextBubble(QFrame):
         for line in self.text.split('\n'):
             painter.drawText(padding, y_pos + font_height, line)
             y_pos += font_height
+        painter.end()
+        self.paint_times.append(time.perf_counter() - start)
     
     def update_position(self):
         if self.isVisible():
-            self.calc_size_and_position()
+            self.reposition()
 
 class MessageHandler(QObject):
     emotion_signal = pyqtSignal(str)
     message_signal = pyqtSignal(str)
     config_signal = pyqtSignal(dict)
-    audio_signal = pyqtSignal(str)
+    audio_signal = pyqtSignal(str, float)
+    chunk_signal = pyqtSignal(dict)
     
     def __init__(self, widget):
         super().__init__()
         self.emotion_signal.connect(widget.change_emotion)
         self.message_signal.connect(widget.show_message)
+        self.chunk_signal.connect(widget.append_message)
         self.config_signal.connect(widget.update_config)
         self.audio_signal.connect(widget.play_audio)
 
 class WifeImageWidget(QWidget):
-    def __init__(self, config, msg_queue, config_path):
+    def __init__(self, config, msg_queue, config_path, status_queue=None, startup=None):
         super().__init__()
         self.config = config
         self.msg_queue = msg_queue
+        self.status_queue = status_queue
+        self.startup = startup
+        self.headless = config.get('process', {}).get('headless', False)
+        self.first_painted = False
         self.config_path = config_path
         self.plugin_dir = os.path.dirname(os.path.abspath(config_path))
         self.emotions_json_path = os.path.join(self.plugin_dir, "emotions.json")
         self.current_image = None
-        self.original_pixmap = None
+        self.compiled_assets = {}
+        self.current_asset = None
+        self.current_entry = None
+        self.pixmap_cache = PixmapCache(config.get('animation', {}).get('pixmap_cache_size', 24))
         self.dragging = False
         self.drag_position = None
-        
-        self.media_player = QMediaPlayer()
+        self.press_position = None
+        self.press_region = None
+        
+        interaction = config.get('interaction', {})
+        self.click_through = interaction.get('click_through', True)
+        self.alpha_threshold = interaction.get('alpha_threshold', 16)
+        self.hit_regions = interaction.get('regions', DEFAULT_REGIONS)
+        
+        animation = config.get('animation', {})
+        self.transition_ms = animation.get('transition_ms', 200)
+        self.displayed_pixmap = None
+        self.fade_from = None
+        self.fade_to = None
+        self.fade_start = 0
+        self.transitions = 0
+        self.transition_frames = 0
+        
+        self.pending_move = None
+        self.pending_size = None
+        self.bubble_dirty = False
+        self.bubble_anchor = None
+        self.resizing = False
+        self.fast_source = None
+        self.fast_source_path = None
+        self.coalesced_events = 0
+        self.frame_times = deque(maxlen=600)
+        
+        self.playback = PlaybackEngine(self, config.get('playback', {}), self.report_playback)
+        
+        idle = config.get('idle', {})
+        self.idle_enabled = idle.get('enabled', True)
+        self.queue_interval = idle.get('queue_interval_ms', 100)
+        self.dormant_queue_interval = idle.get('dormant_queue_interval_ms', 1000)
+        self.dormant = False
+        self.idle_started_at = None
+        self.wakeups = WakeupCounter()
+        self.idle_monitor = IdleMonitor(
+            default_idle_source(lambda: (QCursor.pos().x(), QCursor.pos().y())),
+            threshold=idle.get('threshold', 300),
+            min_interval=idle.get('min_interval', 1),
+            max_interval=idle.get('max_interval', 30),
+            idle_max_interval=idle.get('idle_max_interval', 5)
+        )
+        self.idle_monitor.add_listener(self.on_activity_changed)
         
         self.init_size = (
             config['window']['default_width'], 
@@ -216,12 +341,13 @@ class WifeImageWidget(QWidget):
             self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
         
-        self.image_label = QLabel(self)
+        self.image_label = ImageLabel(self)
         self.image_label.setAlignment(Qt.AlignCenter)
         self.image_label.resize(self.current_size[0], self.current_size[1])
         
         self.text_bubble = TextBubble(None)
         self.text_bubble.set_config(config['chat_bubble'])
+        self.text_bubble.first_glyph_callback = self.report_first_glyph
         
         if self.config['window']['always_on_top']:
             self.text_bubble.set_always_on_top(True)
@@ -230,12 +356,38 @@ class WifeImageWidget(QWidget):
         
         self.msg_timer = QTimer(self)
         self.msg_timer.timeout.connect(self.check_message_queue)
-        self.msg_timer.start(100)
+        self.msg_timer.start(self.queue_interval)
         
         self.settings_timer = QTimer(self)
         self.settings_timer.timeout.connect(self.save_settings)
         self.settings_timer.start(5000)
         
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.timeout.connect(self.send_heartbeat)
+        self.heartbeat_timer.start(int(config.get('process', {}).get('heartbeat_interval', 2) * 1000))
+        
+        self.animation_clock = QTimer(self)
+        self.animation_clock.setTimerType(Qt.PreciseTimer)
+        self.animation_clock.setInterval(max(1, int(1000 / max(1, animation.get('fps', 30)))))
+        self.animation_clock.timeout.connect(self.on_animation_tick)
+        
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setTimerType(Qt.PreciseTimer)
+        self.frame_timer.setInterval(self.frame_interval())
+        self.frame_timer.timeout.connect(self.on_frame)
+        
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(config['window'].get('resize_settle_ms', 150))
+        self.settle_timer.timeout.connect(self.on_resize_settled)
+        
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.sample_activity)
+        if self.idle_enabled:
+            self.idle_timer.start(int(self.idle_monitor.min_interval * 1000))
+        
         self.init_ui()
         
         self.running = True
@@ -243,10 +395,27 @@ class WifeImageWidget(QWidget):
     def init_ui(self):
         self.resize(self.current_size[0], self.current_size[1])
         self.setWindowOpacity(self.config['window']['opacity'])
-        self.load_default_emotion()
         self.move_to_initial_position()
         self.show()
     
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            self.mark_startup('first_paint')
+            QTimer.singleShot(0, self.show_first_frame)
+    
+    def show_first_frame(self):
+        self.load_default_emotion()
+        self.image_label.repaint()
+        self.mark_startup('first_frame')
+        if self.startup:
+            self.send_status('startup', self.startup.marks)
+    
+    def mark_startup(self, name):
+        if self.startup:
+            self.startup.mark(name)
+    
     def move_to_initial_position(self):
         if (self.config.get('position', {}).get('remember', False) and
             self.config['position']['x'] >= 0 and self.config['position']['y'] >= 0):
@@ -260,6 +429,8 @@ class WifeImageWidget(QWidget):
         self.move(x, y)
     
     def save_settings(self):
+        if self.headless:
+            return
         if self.config.get('position', {}).get('remember', False):
             if 'position' not in self.config:
                 self.config['position'] = {}
@@ -278,26 +449,121 @@ class WifeImageWidget(QWidget):
             except Exception:
                 pass
     
-    def load_image(self, image_name):
+    def load_image(self, image_name, animate=False):
         image_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image')
         image_path = os.path.join(image_dir, image_name)
         
         if os.path.exists(image_path):
             self.current_image = image_path
-            self.original_pixmap = QPixmap(image_path)
-            self.update_image_size()
+            self.current_asset = self.compiled_assets.get(image_name)
+            self.update_image_size(animate)
             
             if self.text_bubble.isVisible():
                 self.text_bubble.update_position()
     
-    def update_image_size(self):
-        if self.original_pixmap:
-            scaled_pixmap = self.original_pixmap.scaled(
-                self.width(), self.height(),
-                Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
-            self.image_label.resize(self.width(), self.height())
+    def update_image_size(self, animate=False):
+        if not self.current_image:
+            return
+        
+        source_path = self.current_image
+        if self.current_asset:
+            level = pick_level(self.current_asset, self.width(), self.height())
+            source_path = os.path.join(build_dir(os.path.join(self.plugin_dir, 'image')), level['file'])
+        
+        width, height = self.width(), self.height()
+        
+        if self.resizing:
+            if self.fast_source_path != source_path:
+                self.fast_source_path = source_path
+                self.fast_source = QPixmap(source_path)
+            self.image_label.resize(width, height)
+            self.show_pixmap(self.fast_source.scaled(width, height, Qt.KeepAspectRatio, Qt.FastTransformation))
+            return
+        
+        self.current_entry = self.pixmap_cache.get(
+            (source_path, width, height),
+            lambda: build_entry(QPixmap(source_path), width, height, self.hit_regions, self.alpha_threshold)
+        )
+        self.image_label.resize(width, height)
+        self.show_pixmap(self.current_entry.pixmap, animate)
+    
+    def can_animate(self):
+        return self.isVisible() and not self.isMinimized() and not self.dormant
+    
+    def show_pixmap(self, pixmap, animate=False):
+        if animate and self.transition_ms > 0 and self.displayed_pixmap is not None and self.can_animate():
+            self.fade_from = self.displayed_pixmap
+            self.fade_to = pixmap
+            self.fade_start = time.monotonic()
+            self.transitions += 1
+            if not self.animation_clock.isActive():
+                self.animation_clock.start()
+            return
+        
+        self.fade_from = None
+        self.fade_to = None
+        self.animation_clock.stop()
+        self.set_frame(pixmap)
+        self.apply_input_mask()
+    
+    def set_frame(self, pixmap):
+        self.displayed_pixmap = pixmap
+        self.image_label.setPixmap(pixmap)
+    
+    def on_animation_tick(self):
+        if self.fade_to is None or not self.can_animate():
+            self.finish_transition()
+            return
+        
+        progress = (time.monotonic() - self.fade_start) * 1000 / self.transition_ms
+        if progress >= 1:
+            self.finish_transition()
+            return
+        
+        self.set_frame(blend_frame(self.fade_from, self.fade_to, progress))
+        self.transition_frames += 1
+    
+    def finish_transition(self):
+        self.animation_clock.stop()
+        if self.fade_to is not None:
+            target = self.fade_to
+            self.fade_from = None
+            self.fade_to = None
+            self.set_frame(target)
+            self.apply_input_mask()
+    
+    def pixmap_offset(self):
+        pixmap = self.current_entry.pixmap
+        return (self.width() - pixmap.width()) // 2, (self.height() - pixmap.height()) // 2
+    
+    def apply_input_mask(self):
+        if not self.click_through or not self.current_entry:
+            return
+        
+        if self.resizing:
+            return
+        
+        region = mask_region(self.current_entry, *self.pixmap_offset())
+        if region is None:
+            self.clearMask()
+        else:
+            self.setMask(region)
+    
+    def hit_test(self, pos):
+        if not self.current_entry:
+            return True, None
+        
+        offset_x, offset_y = self.pixmap_offset()
+        x, y = pos.x() - offset_x, pos.y() - offset_y
+        if not self.current_entry.hit_test(x, y):
+            return False, None
+        return True, self.current_entry.region_at(x, y)
+    
+    def on_region_clicked(self, region):
+        self.send_status('touch', region['name'])
+        emotion = region.get('emotion')
+        if emotion:
+            self.change_emotion(emotion)
     
     def load_emotions(self):
         emotions = {}
@@ -306,6 +572,10 @@ class WifeImageWidget(QWidget):
             if os.path.exists(self.emotions_json_path):
                 with open(self.emotions_json_path, 'r', encoding='utf-8') as f:
                     json_data = json.load(f)
+                
+                self.compiled_assets = {
+                    entry['source']: entry for entry in json_data.get('compiled', {}).values()
+                }
                     
                 if 'emotions' in json_data and isinstance(json_data['emotions'], list):
                     for emotion_name in json_data['emotions']:
@@ -319,20 +589,20 @@ class WifeImageWidget(QWidget):
         
         return emotions
     
-    def load_default_emotion(self):
+    def load_default_emotion(self, animate=False):
         for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
             potential_file = f"{self.default_emotion}{ext}"
             image_dir = os.path.join(self.plugin_dir, 'image')
             if os.path.exists(os.path.join(image_dir, potential_file)):
-                self.load_image(potential_file)
+                self.load_image(potential_file, animate)
                 return
         
         if self.emotions:
             first_emotion = next(iter(self.emotions.values()))
-            self.load_image(first_emotion)
+            self.load_image(first_emotion, animate)
     
     def reset_emotion(self):
-        self.load_default_emotion()
+        self.load_default_emotion(animate=True)
     
     @pyqtSlot(str)
     def change_emotion(self, emotion):
@@ -341,10 +611,10 @@ class WifeImageWidget(QWidget):
         
         if emotion in self.config['emotions']:
             image_name = self.config['emotions'][emotion]
-            self.load_image(image_name)
+            self.load_image(image_name, animate=True)
         elif emotion in self.emotions:
             image_name = self.emotions[emotion]
-            self.load_image(image_name)
+            self.load_image(image_name, animate=True)
         
         if self.auto_reset:
             self.emotion_reset_timer.start(self.reset_delay)
@@ -355,6 +625,21 @@ class WifeImageWidget(QWidget):
             self.text_bubble.parent_widget = self
             self.text_bubble.show_message(text)
     
+    @pyqtSlot(dict)
+    def append_message(self, chunk):
+        if chunk.get('text'):
+            self.text_bubble.parent_widget = self
+            self.text_bubble.append_text(chunk['text'], chunk.get('reset', False), chunk if chunk.get('reset') else None)
+    
+    def report_first_glyph(self, chunk):
+        now = time.time()
+        stats = {}
+        if chunk.get('started'):
+            stats['from_prompt_ms'] = (now - chunk['started']) * 1000
+        if chunk.get('first_chunk'):
+            stats['from_chunk_ms'] = (now - chunk['first_chunk']) * 1000
+        self.send_status('first_glyph', stats)
+    
     @pyqtSlot(dict)
     def update_config(self, config_data):
         if 'always_on_top' in config_data:
@@ -374,57 +659,146 @@ class WifeImageWidget(QWidget):
         
         self.config['window']['always_on_top'] = always_on_top
     
-    @pyqtSlot(str)
-    def play_audio(self, audio_path):
+    @pyqtSlot(str, float)
+    def play_audio(self, audio_path, queued_at=0.0):
         if not audio_path or not os.path.exists(audio_path):
             return
             
         try:
-            self.media_player.setMedia(QMediaContent(QUrl.fromLocalFile(audio_path)))
-            self.media_player.play()
+            self.playback.enqueue(audio_path, queued_at or None)
         except Exception as e:
             pass
     
+    def report_playback(self, stats):
+        self.send_status('playback', stats)
+    
+    def send_status(self, msg_type, content=None):
+        if self.status_queue:
+            try:
+                self.status_queue.put_nowait({'type': msg_type, 'content': content, 'timestamp': time.time()})
+            except Exception:
+                pass
+    
+    def start_profile(self, options):
+        def run():
+            from .sampler import profile
+            try:
+                result = profile(options['path'], options.get('duration', 10), options.get('interval', 0.005),
+                                 options.get('limit', 8))
+            except Exception as e:
+                result = {'error': str(e)}
+            self.send_status('profile', result)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def send_heartbeat(self):
+        self.wakeups.tick()
+        self.send_status('heartbeat', {
+            'dormant': self.dormant,
+            'wakeups_per_minute': self.wakeups.per_minute(),
+            'idle_samples_per_minute': self.idle_monitor.wakeups_per_minute(),
+        })
+    
+    def sample_activity(self):
+        self.wakeups.tick()
+        interval = self.idle_monitor.sample()
+        if self.running and self.idle_enabled:
+            self.idle_timer.start(int(interval * 1000))
+    
+    def on_activity_changed(self, idle, idle_seconds):
+        now = time.time()
+        if idle:
+            self.idle_started_at = now - idle_seconds
+        self.send_status('activity', {
+            'idle': idle,
+            'idle_seconds': idle_seconds,
+            'since': self.idle_started_at,
+            'wakeups_per_minute': self.wakeups.per_minute(),
+        })
+        if not idle:
+            self.idle_started_at = None
+        self.update_dormant()
+    
+    def update_dormant(self):
+        dormant = self.idle_monitor.idle or not self.isVisible() or self.isMinimized()
+        if dormant == self.dormant:
+            return
+        self.dormant = dormant
+        self.text_bubble.dormant = dormant
+        if dormant:
+            self.finish_transition()
+            self.text_bubble.repaint_timer.stop()
+            self.text_bubble.flush_pending_text()
+            self.save_settings()
+            self.settings_timer.stop()
+            self.msg_timer.setInterval(self.dormant_queue_interval)
+        else:
+            self.settings_timer.start()
+            self.msg_timer.setInterval(self.queue_interval)
+            if self.text_bubble.pending_text:
+                self.text_bubble.repaint_timer.start()
+    
     def check_message_queue(self):
+        self.wakeups.tick()
         try:
-            if self.msg_queue and not self.msg_queue.empty():
+            for _ in range(32):
+                if not self.msg_queue or self.msg_queue.empty():
+                    break
                 msg = self.msg_queue.get_nowait()
                 
                 if msg['type'] == 'emotion':
                     self.msg_handler.emotion_signal.emit(msg['content'])
                 elif msg['type'] == 'message':
                     self.msg_handler.message_signal.emit(msg['content'])
+                elif msg['type'] == 'message_chunk':
+                    self.msg_handler.chunk_signal.emit(msg['content'])
                 elif msg['type'] == 'config':
                     self.msg_handler.config_signal.emit(msg['content'])
                 elif msg['type'] == 'audio':
-                    self.msg_handler.audio_signal.emit(msg['content'])
+                    self.msg_handler.audio_signal.emit(msg['content'], msg.get('timestamp') or 0.0)
+                elif msg['type'] == 'ping':
+                    self.send_status('pong', msg['content'])
+                elif msg['type'] == 'profile':
+                    self.start_profile(msg['content'])
                 elif msg['type'] == 'exit':
                     self.close()
+                    break
         except queue.Empty:
             pass
         except Exception:
             pass
     
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton and self.config['window']['drag_enabled']:
-            self.dragging = True
-            self.drag_position = event.globalPos() - self.frameGeometry().topLeft()
+        hit, region = self.hit_test(event.pos())
+        if not hit:
+            event.ignore()
+            return
+        
+        if event.button() == Qt.LeftButton:
+            self.press_position = event.globalPos()
+            self.press_region = region
+            if self.config['window']['drag_enabled']:
+                self.dragging = True
+                self.drag_position = event.globalPos() - self.frameGeometry().topLeft()
             event.accept()
         elif event.button() == Qt.RightButton:
             self.show_context_menu(event.globalPos())
     
     def mouseMoveEvent(self, event):
         if event.buttons() == Qt.LeftButton and self.dragging:
-            self.move(event.globalPos() - self.drag_position)
-            
-            if self.text_bubble.isVisible():
-                self.text_bubble.update_position()
-                
+            self.pending_move = event.globalPos() - self.drag_position
+            self.schedule_frame()
             event.accept()
     
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.dragging = False
+            if self.press_region and self.press_position is not None:
+                if (event.globalPos() - self.press_position).manhattanLength() < 4:
+                    self.on_region_clicked(self.press_region)
+            self.press_position = None
+            self.press_region = None
+            self.report_frame_stats()
             self.save_settings()
     
     def wheelEvent(self, event):
@@ -434,22 +808,82 @@ class WifeImageWidget(QWidget):
         delta = event.angleDelta().y()
         scale_factor = 1.1 if delta > 0 else 0.9
         
-        new_width = int(self.width() * scale_factor)
-        new_height = int(self.height() * scale_factor)
+        width, height = self.pending_size or (self.width(), self.height())
+        new_width = int(width * scale_factor)
+        new_height = int(height * scale_factor)
         
         new_width = max(100, new_width)
         new_height = max(100, new_height)
         
-        self.resize(new_width, new_height)
-        self.current_size = (new_width, new_height)
+        self.pending_size = (new_width, new_height)
+        self.resizing = True
+        self.settle_timer.start()
+        self.schedule_frame()
+    
+    def frame_interval(self):
+        refresh_rate = 60
+        try:
+            refresh_rate = QApplication.primaryScreen().refreshRate() or 60
+        except Exception:
+            pass
+        return max(1, int(1000 / refresh_rate))
+    
+    def schedule_frame(self):
+        if self.frame_timer.isActive():
+            self.coalesced_events += 1
+        else:
+            self.frame_timer.start()
+    
+    def on_frame(self):
+        start = time.perf_counter()
+        
+        if self.pending_move is not None:
+            self.move(self.pending_move)
+            self.pending_move = None
+            self.bubble_dirty = True
         
-        self.update_image_size()
+        if self.pending_size is not None:
+            new_width, new_height = self.pending_size
+            self.pending_size = None
+            self.resize(new_width, new_height)
+            self.current_size = (new_width, new_height)
+            self.bubble_dirty = True
         
-        if self.text_bubble.isVisible():
+        if self.bubble_dirty and self.text_bubble.isVisible():
             self.text_bubble.update_position()
+            self.bubble_anchor = self.geometry()
+        self.bubble_dirty = False
         
+        if self.dragging or self.resizing:
+            self.frame_times.append(time.perf_counter() - start)
+    
+    def on_resize_settled(self):
+        self.resizing = False
+        self.fast_source = None
+        self.fast_source_path = None
+        self.update_image_size()
+        self.report_frame_stats()
         self.save_settings()
     
+    def frame_stats(self):
+        times = sorted(self.frame_times)
+        if not times:
+            return None
+        return {
+            'frames': len(times),
+            'avg_ms': sum(times) / len(times) * 1000,
+            'p95_ms': times[int(len(times) * 0.95)] * 1000,
+            'max_ms': times[-1] * 1000,
+            'coalesced': self.coalesced_events,
+        }
+    
+    def report_frame_stats(self):
+        stats = self.frame_stats()
+        if stats:
+            self.send_status('frame_stats', stats)
+        self.frame_times.clear()
+        self.coalesced_events = 0
+    
     def show_context_menu(self, pos):
         context_menu = QMenu(self)
         
@@ -490,14 +924,32 @@ class WifeImageWidget(QWidget):
     
     def moveEvent(self, event):
         super().moveEvent(event)
-        if self.text_bubble.isVisible():
-            self.text_bubble.update_position()
+        if self.text_bubble.isVisible() and self.geometry() != self.bubble_anchor:
+            self.bubble_dirty = True
+            self.schedule_frame()
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.update_image_size()
         if self.text_bubble.isVisible():
-            self.text_bubble.update_position()
+            self.bubble_dirty = True
+            self.schedule_frame()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.finish_transition()
+        self.update_dormant()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_dormant()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.finish_transition()
+            self.update_dormant()
     
     def closeEvent(self, event):
         self.save_settings()
@@ -506,27 +958,38 @@ class WifeImageWidget(QWidget):
             self.text_bubble.hide()
             self.text_bubble.close()
         
-        self.media_player.stop()
+        if self.playback:
+            self.playback.stop()
         
         self.running = False
         self.msg_timer.stop()
         self.settings_timer.stop()
+        self.heartbeat_timer.stop()
+        self.animation_clock.stop()
+        self.frame_timer.stop()
+        self.settle_timer.stop()
+        self.idle_timer.stop()
         event.accept()
 
-def start_ui(config_path, msg_queue):
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+def start_ui(config_path, msg_queue, status_queue=None, config=None, startup=None):
+    if config is None:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+    
+    if config.get('process', {}).get('headless', False):
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
     
     app = QApplication(sys.argv)
-    widget = WifeImageWidget(config, msg_queue, config_path)
+    if startup:
+        startup.mark('app_created')
+    widget = WifeImageWidget(config, msg_queue, config_path, status_queue, startup)
+    if startup:
+        startup.mark('widget_created')
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
     try:
-        config_path = "config.yaml"
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
+        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
         msg_queue = multiprocessing.Queue()
         start_ui(config_path, msg_queue)
     except Exception: